@@ -2,37 +2,53 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 import stellar_sdk
 from stellar_sdk import (
+    Account,
     Keypair,
     Server,
+    ServerAsync,
     TransactionBuilder,
     Network,
     Asset,
-    Payment,
-    Signer,
-    SetOptions
+    CreateAccount,
+    ClaimClaimableBalance,
+    TransactionEnvelope
 )
-import requests
+from stellar_sdk.client.aiohttp_client import AiohttpClient
+from stellar_sdk.exceptions import BadRequestError
+import asyncio
 import os
+import uuid
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from decimal import InvalidOperation
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_
-from decimal import Decimal
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 from flask_migrate import Migrate
+from src.http_client import default_client as http_client
+from src.horizon_pool import HorizonPool
+from src.price_service import PriceCache, ProviderChain, RateUnavailable, fetch_xlm_prices
+from src.dex_rates import DexRateEngine
+from src.path_service import PathFinder
+from src.fee_oracle import FeeOracle
+from src.escrow_builder import (
+    append_escrow_setup, append_pooled_escrow_setup, append_claimable_escrow, build_settlements, add_signature,
+    escrow_starting_balance, APPROVAL_THRESHOLD
+)
+from src.escrow_pool import EscrowAccountPool
+from src.concurrency import run_concurrently
+from src.balance_cache import BalanceCache
+from src.single_flight import SingleFlight
+from src.sequence_manager import SequenceManager
+from src.channel_accounts import ChannelPool
+from src.submission_queue import SubmissionQueue
+from src.payouts import MAX_PAYOUT_ROWS, read_csv, validate_rows, chunked, failed_operations, memo_required
+from src.rate_store import RateStore
+from src.money import to_stroops, from_stroops, format_stroops, xlm_to_local, local_to_xlm
+from src.conversion import CrossRates
+from src.price_history import PriceHistory
 from functools import lru_cache
-import time
-
-# Add caching decorator (updates every 5 minutes)
-@lru_cache(maxsize=32)
-def get_xlm_price(currency='USD'):
-    """Get current XLM price with caching"""
-    try:
-        response = requests.get(f'https://api.coingecko.com/api/v3/simple/price?ids=stellar&vs_currencies={currency}')
-        return Decimal(response.json()['stellar'][currency.lower()])
-    except Exception as e:
-        return Decimal('0.10')
 
 # Configure SQLite
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///stellarpay.db'
@@ -42,9 +58,52 @@ migrate = Migrate(app, db)
 
 # Stellar configuration for testnet
 HORIZON_URL = "https://horizon-testnet.stellar.org"
+# Comma-separated Horizon endpoints, e.g. our own node plus the public one
+HORIZON_URLS = [url for url in os.environ.get('HORIZON_URLS', HORIZON_URL).split(',') if url]
 NETWORK_PASSPHRASE = Network.TESTNET_NETWORK_PASSPHRASE
 FRIENDBOT_URL = "https://friendbot.stellar.org"
-server = Server(horizon_url=HORIZON_URL)
+# Horizon, friendbot and price calls all share one pooled keep-alive HTTP client;
+# Horizon reads go to the fastest healthy endpoint and submissions stay pinned to one
+horizon_pool = HorizonPool(HORIZON_URLS)
+horizon_pool.start()
+server = Server(horizon_url=horizon_pool.base_url,
+                client=http_client.horizon_client(horizon_pool.base_url, pool=horizon_pool))
+# ASYNC_HORIZON=1 serves the dashboard from an async view that reads Horizon over ServerAsync
+ASYNC_HORIZON = os.environ.get('ASYNC_HORIZON') == '1'
+
+# Currencies kept warm by the background price refresher
+SUPPORTED_CURRENCIES = ['USD', 'KES', 'INR', 'AED']
+# Rates are published by one worker and shared with the rest through this file
+RATE_STORE_PATH = os.path.join(app.instance_path, 'rates.db')
+price_history = PriceHistory(os.path.join(app.instance_path, 'price_history'))
+# Fiat anchor assets priced from DEX liquidity; other currencies come from CoinGecko
+FIAT_ANCHORS = {
+    'USD': Asset('USDC', 'GBBD47IF6LWK7P7MDEVSCWR7DPUWV3NY3DTQEVFL4NAT4AQH3ZLLFLA5'),
+}
+dex_rates = DexRateEngine(server, FIAT_ANCHORS)
+path_finder = PathFinder(server, dex_rates.current_ledger)
+# Fee bids come from fee_stats cached per ledger, so building a tx needs no fee lookup
+fee_oracle = FeeOracle(server, dex_rates.current_ledger)
+fee_oracle.start()
+sequence_manager = SequenceManager(server)
+
+# Channel accounts pay fees and sequence numbers so one account can submit in parallel
+CHANNEL_ACCOUNT_SECRETS = [s for s in os.environ.get('CHANNEL_ACCOUNT_SECRETS', '').split(',') if s]
+TREASURY_SECRET = os.environ.get('TREASURY_SECRET')
+# Pre-funded escrow accounts kept ready, and how many are created per refill transaction
+ESCROW_POOL_SIZE = int(os.environ.get('ESCROW_POOL_SIZE', 0))
+ESCROW_POOL_REFILL_BATCH = int(os.environ.get('ESCROW_POOL_REFILL_BATCH', 5))
+ESCROW_SIGNERS = 3  # sender, receiver and mediator
+ESCROW_MODES = ('account', 'claimable_balance')  # values of Escrow.mode
+price_provider = ProviderChain([
+    ('stellar-dex', dex_rates),
+    ('coingecko', fetch_xlm_prices),
+])
+# Concurrent cache misses for the same currencies share one upstream price lookup
+price_cache = PriceCache(fetch=SingleFlight().wrap(price_provider, key=frozenset), store=RateStore(RATE_STORE_PATH),
+                         history=price_history, supported=SUPPORTED_CURRENCIES)
+price_cache.start(SUPPORTED_CURRENCIES)
+QUOTE_TTL = 60  # seconds a previewed rate stays locked
 
 ##########################################################
 # Database Models
@@ -56,7 +115,7 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    stellar_public_key = db.Column(db.String(56), nullable=False)
+    stellar_public_key = db.Column(db.String(56), nullable=False, index=True)
     stellar_secret_key = db.Column(db.String(56), nullable=False) #Encrypt in production
     country = db.Column(db.String(50), default='KE')  # KE for Kenya, IN for India
     local_currency = db.Column(db.String(3), default='KES')  # KES, INR, etc
@@ -67,81 +126,381 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+# Matches the partial indexes below; it must be a literal, not a bound parameter, for SQLite to use them
+ESCROW_PENDING = db.text("status = 'pending'")
+
 class Escrow(db.Model):
+    # Partial indexes behind escrow_approvals: pending escrows per party, soonest deadline first
+    __table_args__ = (
+        db.Index('ix_escrow_pending_sender', 'sender_id', 'deadline',
+                 sqlite_where=ESCROW_PENDING, postgresql_where=ESCROW_PENDING),
+        db.Index('ix_escrow_pending_receiver', 'receiver_public_key', 'deadline',
+                 sqlite_where=ESCROW_PENDING, postgresql_where=ESCROW_PENDING),
+        db.Index('ix_escrow_pending_mediator', 'mediator_public_key', 'deadline',
+                 sqlite_where=ESCROW_PENDING, postgresql_where=ESCROW_PENDING),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, nullable=False)
     receiver_public_key = db.Column(db.String(56), nullable=False)
     mediator_public_key = db.Column(db.String(56), nullable=True)
-    escrow_public_key = db.Column(db.String(56), nullable=False)
-    escrow_secret_key = db.Column(db.String(56), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, approved, released, locked
+    # 'account' escrows hold funds in a multisig account, 'claimable_balance' ones in a claimable balance
+    mode = db.Column(db.String(20), nullable=False, default='account')
+    escrow_public_key = db.Column(db.String(56), nullable=True)
+    escrow_secret_key = db.Column(db.String(56), nullable=True)
+    balance_id = db.Column(db.String(72), nullable=True)
+    sender_public_key = db.Column(db.String(56), nullable=True)
+    # Pre-built settlement envelopes that collect signatures until the threshold is met
+    release_xdr = db.Column(db.Text, nullable=True)
+    refund_xdr = db.Column(db.Text, nullable=True)
+    amount_stroops = db.Column(db.BigInteger, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, approved, released, refunded, locked
     deadline = db.Column(db.DateTime, nullable=False)
     approvals = db.Column(db.Integer, default=0)  # New field for tracking approvals
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @property
+    def amount(self):
+        return from_stroops(self.amount_stroops)
+
     def is_expired(self):
         return datetime.utcnow() > self.deadline
 
+    def signer_keys(self):
+        return [key for key in (self.sender_public_key, self.receiver_public_key, self.mediator_public_key) if key]
+
+class Quote(db.Model):
+    # Rates locked at preview time and reused when the payment is submitted
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    destination = db.Column(db.String(56), nullable=False)
+    amount_stroops = db.Column(db.BigInteger, nullable=False)
+    recipient_currency = db.Column(db.String(3), nullable=False)
+    recipient_rate = db.Column(db.BigInteger, nullable=False)  # local units per XLM, 1e-7 fixed point
+    deliver_currency = db.Column(db.String(3), default='XLM')  # anchor asset the recipient receives
+    deliver_min = db.Column(db.BigInteger)  # least the path payment may deliver, in anchor stroops
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def is_expired(self):
+        return datetime.utcnow() > self.expires_at
+
 ##########################################################
 # Utility Functions
 ##########################################################
 
 def fund_account(public_key):
-    response = requests.get(f"{FRIENDBOT_URL}?addr={public_key}")
+    response = http_client.get(FRIENDBOT_URL, params={'addr': public_key})
     return response.json()
 
-def get_base_fee():
-    return server.fetch_base_fee()
-
-def get_xlm_price(currency='USD'):
-    """Get current XLM price from CoinGecko API"""
+def get_base_fee(urgency='normal'):
+    """Return the per-operation fee to bid, from the cached fee oracle"""
+    return fee_oracle.recommend(urgency)
+
+def payment_tx_builder(source_kp, channel, append_ops, base_fee, cosigners=()):
+    """Return ``build(tx_source_account)`` for ops paid from ``source_kp``, fronted by ``channel`` if given.
+
+    ``append_ops(builder, op_source)`` adds the operations; ``op_source`` is the
+    real account when a channel fronts the transaction, otherwise None.
+    ``cosigners`` are extra keypairs whose accounts are the source of some ops.
+    """
+    def build(tx_source_account):
+        builder = TransactionBuilder(
+            source_account=tx_source_account,
+            network_passphrase=NETWORK_PASSPHRASE,
+            base_fee=base_fee
+        )
+        append_ops(builder, source_kp.public_key if channel else None)
+        tx = builder.set_timeout(30).build()
+        tx.sign(source_kp)
+        for keypair in cosigners:
+            tx.sign(keypair)
+        if channel:
+            tx.sign(channel)
+        return tx
+    return build
+
+def submit_payment_ops(source_kp, append_ops, base_fee=None, cosigners=(), skip_memo_required_check=False):
+    """Submit ops paid from ``source_kp``, using a channel account as the tx source when available"""
+    base_fee = base_fee or get_base_fee()
+    channel = channel_pool.lease() if len(channel_pool) else None
+    build = payment_tx_builder(source_kp, channel, append_ops, base_fee, cosigners)
     try:
-        response = requests.get(f'https://api.coingecko.com/api/v3/simple/price?ids=stellar&vs_currencies={currency}')
-        return Decimal(response.json()['stellar'][currency.lower()])
-    except Exception as e:
-        return Decimal('0.10')  # Fallback value
-def convert_to_local(xlm_amount, currency):
-    """Convert XLM amount to local currency"""
-    rate = get_xlm_price(currency)
-    return Decimal(xlm_amount) * rate
+        return sequence_manager.submit((channel or source_kp).public_key, build, skip_memo_required_check)
+    except BadRequestError as e:
+        # A channel that can no longer pay fees sits out until it is topped up
+        codes = (e.extras or {}).get('result_codes', {})
+        if channel and codes.get('transaction') == 'tx_insufficient_balance':
+            channel_pool.mark_unhealthy(channel)
+        raise
+    finally:
+        if channel:
+            channel_pool.release(channel)
+
+def enqueue_payment_ops(source_kp, append_ops, owner=None):
+    """Sign ops paid from ``source_kp`` and hand them to the submission queue; returns the job ID"""
+    channel = channel_pool.lease() if len(channel_pool) else None
+    tx_source = (channel or source_kp).public_key
+    try:
+        # A build that fails (e.g. a malformed destination) hands its sequence number back
+        tx = sequence_manager.build(tx_source, payment_tx_builder(source_kp, channel, append_ops, get_base_fee()))
+        try:
+            return submission_queue.enqueue(tx, owner)
+        except Exception:
+            sequence_manager.release(tx_source, tx.transaction.sequence)
+            raise
+    finally:
+        # Released only now, so the channel's stored sequence includes this transaction
+        if channel:
+            channel_pool.release(channel)
+
+def submit_payout_batch(source_kp, batch, base_fee):
+    """Pay every ``(row, destination, stroops)`` in ``batch`` with one transaction.
+
+    If Horizon rejects the transaction because some ops failed, those rows
+    are reported and the rest are resubmitted once without them.
+    Destinations are already checked for SEP-29 memo requirements by
+    ``validate_rows``, so the SDK's per-operation check is skipped.
+    """
+    results = {}
+    for attempt in range(2):
+        def append_ops(builder, op_source):
+            for _, destination, stroops in batch:
+                builder.append_payment_op(
+                    destination=destination,
+                    asset=Asset.native(),
+                    amount=format_stroops(stroops),
+                    source=op_source
+                )
 
-def convert_to_xlm(amount, currency):
-    rate = get_xlm_price(currency)
-    return Decimal(amount) / rate
+        try:
+            response = submit_payment_ops(source_kp, append_ops, base_fee, skip_memo_required_check=True)
+        except Exception as e:
+            failed = failed_operations(e)
+            if attempt == 0 and failed:
+                for op_index, code in failed.items():
+                    results[batch[op_index][0]] = {'status': 'failed', 'error': code}
+                batch = [row for op_index, row in enumerate(batch) if op_index not in failed]
+                if batch:
+                    continue
+                break
+            for row, _, _ in batch:
+                results[row] = {'status': 'failed', 'error': str(e)}
+            break
+        for row, _, stroops in batch:
+            results[row] = {'status': 'sent', 'amount': format_stroops(stroops), 'hash': response['hash']}
+        break
+    return results
+
+def top_up_channel(public_key, amount_stroops, exists):
+    """Fund a channel account from the treasury, or via friendbot on testnet"""
+    if not TREASURY_SECRET:
+        if exists:
+            raise RuntimeError("TREASURY_SECRET is required to top up existing channel accounts")
+        fund_account(public_key)
+        return
+
+    def append_ops(builder, op_source):
+        if exists:
+            builder.append_payment_op(destination=public_key, asset=Asset.native(),
+                                      amount=format_stroops(amount_stroops), source=op_source)
+        else:
+            builder.append_operation(CreateAccount(destination=public_key,
+                                                   starting_balance=format_stroops(amount_stroops),
+                                                   source=op_source))
+
+    submit_from_treasury(append_ops)
+
+def submit_from_treasury(append_ops):
+    """Submit ops straight from the treasury account, never through a channel"""
+    treasury_kp = Keypair.from_secret(TREASURY_SECRET)
+    build = payment_tx_builder(treasury_kp, None, append_ops, get_base_fee())
+    return sequence_manager.submit(treasury_kp.public_key, build)
+
+def create_escrow_accounts(keypairs):
+    """Create pooled escrow accounts holding the escrow reserve; returns their starting sequences"""
+    if not TREASURY_SECRET:
+        # Friendbot funds one account per call, each in its own ledger
+        return {kp.public_key: fund_account(kp.public_key)['ledger'] << 32 for kp in keypairs}
+
+    starting_balance = format_stroops(escrow_starting_balance(0, ESCROW_SIGNERS))
+
+    def append_ops(builder, op_source):
+        for kp in keypairs:
+            builder.append_operation(CreateAccount(destination=kp.public_key, starting_balance=starting_balance))
+
+    # A new account's sequence number starts at its creation ledger << 32
+    ledger = submit_from_treasury(append_ops)['ledger']
+    return {kp.public_key: ledger << 32 for kp in keypairs}
+
+def reclaim_escrow_account(keypair, sequence):
+    """Merge an unused pooled escrow account back into the treasury"""
+    tx = TransactionBuilder(
+        source_account=Account(keypair.public_key, sequence),
+        network_passphrase=NETWORK_PASSPHRASE,
+        base_fee=get_base_fee()
+    ).append_account_merge_op(destination=Keypair.from_secret(TREASURY_SECRET).public_key).set_timeout(30).build()
+    tx.sign(keypair)
+    server.submit_transaction(tx)
+
+def resync_sequence(public_key):
+    """Reload ``public_key``'s sequence number on next use, in this process and the channel store"""
+    sequence_manager.resync(public_key)
+    channel_pool.resync(public_key)
+
+# Payments are submitted by background workers so requests do not wait for consensus
+submission_queue = SubmissionQueue(server, os.path.join(app.instance_path, 'submissions.db'),
+                                   NETWORK_PASSPHRASE, on_bad_seq=resync_sequence)
+submission_queue.start()
+
+# Escrow accounts are pre-created in the background so initiate_escrow only sends one payment
+escrow_pool = EscrowAccountPool(
+    server, os.path.join(app.instance_path, 'escrow_pool.db'),
+    create_escrow_accounts, reclaim_escrow_account if TREASURY_SECRET else None,
+    target_size=ESCROW_POOL_SIZE, refill_batch=ESCROW_POOL_REFILL_BATCH
+)
+if ESCROW_POOL_SIZE:
+    escrow_pool.start()
 
-##########################################################
-# Utility Functions (Updated)
-##########################################################
+# Channel leases and their sequence numbers are shared by every worker through this file
+channel_pool = ChannelPool(server, os.path.join(app.instance_path, 'channels.db'),
+                           [Keypair.from_secret(s) for s in CHANNEL_ACCOUNT_SECRETS], top_up_channel,
+                           sequences=sequence_manager)
+if len(channel_pool):
+    channel_pool.start()
 
 def get_xlm_price(currency='USD'):
-    """Get current XLM price from CoinGecko API"""
-    try:
-        response = requests.get(f'https://api.coingecko.com/api/v3/simple/price?ids=stellar&vs_currencies={currency}')
-        return Decimal(response.json()['stellar'][currency.lower()])
-    except Exception as e:
-        return Decimal('0.10')  # Fallback value
-
-def convert_to_xlm(amount, currency):
-    """Convert local currency to XLM"""
-    rate = get_xlm_price(currency)
-    return Decimal(amount) / rate
+    """Get current XLM price from the shared price cache"""
+    return price_cache.get(currency)
 
-def convert_to_local(xlm_amount, currency):  # <-- ADD THIS
-    """Convert XLM to local currency"""
-    rate = get_xlm_price(currency)
-    return Decimal(xlm_amount) * rate
+def get_display_rate(currency):
+    """Get the XLM price to show on a page, or None while no rate is available"""
+    try:
+        return get_xlm_price(currency)
+    except RateUnavailable:
+        return None
+
+def get_rates(currencies, partial=False):
+    """Get a {currency: XLM price} snapshot for several currencies at once"""
+    return price_cache.get_rates(currencies, partial)
+
+def convert_to_xlm(amount_units, currency, rates=None):
+    """Convert local currency units to stroops, optionally against a rates snapshot"""
+    rates = rates or get_rates([currency])
+    return local_to_xlm(amount_units, to_stroops(rates[currency.upper()]))
+
+def convert_to_local(stroops, currency, rates=None):
+    """Convert stroops to local currency units, optionally against a rates snapshot"""
+    rates = rates or get_rates([currency])
+    return xlm_to_local(stroops, to_stroops(rates[currency.upper()]))
+
+@lru_cache(maxsize=8)
+def _cross_rates(snapshot):
+    return CrossRates(dict(snapshot))
+
+def get_cross_rates():
+    """Get the cross-rate matrix for the current rates snapshot, built once per snapshot"""
+    rates = get_rates(SUPPORTED_CURRENCIES, partial=True)
+    return _cross_rates(tuple(sorted(rates.items())))
+
+def issue_quote(user_id, destination, amount_stroops, recipient_currency, rates, deliver_currency='XLM',
+                deliver_min=None):
+    """Lock the recipient rate from ``rates`` (and a path payment's ``dest_min``) into a short-lived quote"""
+    quote = Quote(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        destination=destination,
+        amount_stroops=amount_stroops,
+        recipient_currency=recipient_currency,
+        recipient_rate=to_stroops(rates[recipient_currency.upper()]),
+        deliver_currency=deliver_currency,
+        deliver_min=deliver_min,
+        expires_at=datetime.utcnow() + timedelta(seconds=QUOTE_TTL)
+    )
+    db.session.add(quote)
+    db.session.commit()
+    return quote
+
+def redeem_quote(quote_id, user_id):
+    """Return the caller's unused, unexpired quote and mark it used, or None"""
+    # One conditional UPDATE, so two concurrent submits cannot both redeem it
+    redeemed = Quote.query.filter(
+        Quote.id == quote_id,
+        Quote.user_id == user_id,
+        Quote.used == False,
+        Quote.expires_at > datetime.utcnow()
+    ).update({'used': True}, synchronize_session=False)
+    db.session.commit()
+    if redeemed != 1:
+        return None
+    return Quote.query.get(quote_id)
+
+def native_balance(account):
+    """Get the XLM balance in stroops from a Horizon account record"""
+    for balance in account['balances']:
+        if balance['asset_type'] == 'native':
+            return to_stroops(balance['balance'])
+    return 0
+
+def fetch_stellar_balance(public_key):
+    """Get XLM balance in stroops from Stellar network"""
+    return native_balance(server.accounts().account_id(public_key).call())
+
+def async_horizon():
+    """Open a ServerAsync on the fastest healthy Horizon endpoint, for one async view.
+
+    Flask runs every async view in its own event loop and an aiohttp
+    session is bound to the loop that created it, so the client cannot be
+    shared across requests the way ``server``'s is.
+    """
+    url = horizon_pool.route(horizon_pool.base_url)
+    return ServerAsync(horizon_url=url, client=AiohttpClient(request_timeout=http_client.policy_for(url)['timeout']))
+
+async def fetch_stellar_balance_async(public_key):
+    """``fetch_stellar_balance`` over ServerAsync"""
+    async with async_horizon() as horizon:
+        return native_balance(await horizon.accounts().account_id(public_key).call())
+
+# Balances are loaded once, then kept current by each account's payment stream
+balance_cache = BalanceCache(server, fetch_stellar_balance)
+
+def sign_escrow_settlement(escrow, keypair):
+    """Add ``keypair``'s signature to the escrow's release (refund once expired) envelope.
+
+    The envelope is submitted as-is once ``APPROVAL_THRESHOLD`` signers have
+    signed. Returns ``(signatures, settled)``.
+    """
+    refund = escrow.is_expired()
+    envelope = TransactionEnvelope.from_xdr(escrow.refund_xdr if refund else escrow.release_xdr,
+                                            NETWORK_PASSPHRASE)
+    signatures = add_signature(envelope, keypair, escrow.signer_keys())
+    if refund:
+        escrow.refund_xdr = envelope.to_xdr()
+    else:
+        escrow.release_xdr = envelope.to_xdr()
+        escrow.approvals = signatures
+    if signatures < APPROVAL_THRESHOLD:
+        return signatures, False
+    server.submit_transaction(envelope)
+    escrow.status = 'refunded' if refund else 'released'
+    balance_cache.invalidate(escrow.receiver_public_key)
+    balance_cache.invalidate(escrow.sender_public_key)
+    return signatures, True
 
 def get_stellar_balance(public_key):
-    """Get XLM balance from Stellar network"""
+    """Get XLM balance in stroops, served from the stream-backed balance cache"""
+    try:
+        return balance_cache.get(public_key)
+    except Exception:
+        return 0
+
+async def get_stellar_balance_async(public_key):
+    """``get_stellar_balance`` for async views; a cache miss does not block the event loop"""
     try:
-        account = server.accounts().account_id(public_key).call()
-        for balance in account['balances']:
-            if balance['asset_type'] == 'native':
-                return Decimal(balance['balance'])
-        return Decimal('0')
-    except:
-        return Decimal('0')
+        return await balance_cache.get_async(public_key, fetch_stellar_balance_async)
+    except Exception:
+        return 0
 
 ##########################################################
 # Authentication Endpoints
@@ -238,54 +597,252 @@ def send_payment():
         return redirect(url_for('login'))
 
     user = User.query.get(session['user_id'])
-    if request.method == "POST":
+    if request.method == "POST" and request.form.get('quote_id'):
+        # Submitting a previewed payment settles at the locked rate, no price lookup
+        quote = redeem_quote(request.form.get('quote_id'), user.id)
+        if not quote:
+            flash("Quote expired, please preview the payment again", "warning")
+            return redirect(url_for('send_payment'))
+        dest_public = quote.destination
+        amount = quote.amount_stroops
+        recipient_currency = quote.recipient_currency
+        deliver_currency = quote.deliver_currency or 'XLM'
+        rates = {recipient_currency.upper(): from_stroops(quote.recipient_rate)}
+        route = None
+        if deliver_currency != 'XLM':
+            try:
+                route = path_finder.send_route(Asset.native(), amount, FIAT_ANCHORS[deliver_currency])
+            except Exception as e:
+                flash(f"Payment failed: {e}", "danger")
+                return redirect(url_for('send_payment'))
+            # Deliver what the preview promised or fail on the ledger, never less
+            route['dest_min'] = quote.deliver_min or route['dest_min']
+    elif request.method == "POST":
         dest_public = request.form.get('destination')
-        amount = Decimal(request.form.get('amount'))
+        try:
+            amount = to_stroops(request.form.get('amount'))
+        except InvalidOperation:
+            flash("Payment failed: enter a valid amount", "danger")
+            return redirect(url_for('send_payment'))
 
         # Get recipient's currency preference
         recipient = User.query.filter_by(stellar_public_key=dest_public).first()
         recipient_currency = recipient.local_currency if recipient else 'XLM'
 
-        # Convert amount to XLM
-        if request.form.get('currency') != 'XLM':
-            amount = convert_to_xlm(amount, request.form.get('currency'))
+        # Deliver XLM, or an anchor asset via a DEX path payment
+        deliver_currency = request.form.get('deliver_currency') or 'XLM'
+        if deliver_currency != 'XLM' and deliver_currency not in FIAT_ANCHORS:
+            flash(f"Cannot deliver {deliver_currency}", "danger")
+            return redirect(url_for('send_payment'))
+
+        # One rates snapshot covers both the sender's and recipient's currency
+        currency = (request.form.get('currency') or 'XLM').upper()
+        if currency != 'XLM' and currency not in SUPPORTED_CURRENCIES:
+            flash(f"Unsupported currency {currency}", "danger")
+            return redirect(url_for('send_payment'))
+        try:
+            rates = get_rates([currency, recipient_currency])
+        except RateUnavailable as e:
+            # Never price a payment without a real rate
+            flash(f"Payment not sent: {e}", "danger")
+            return redirect(url_for('send_payment'))
 
-        # Show conversion preview
+        # Convert amount to XLM
+        if currency != 'XLM':
+            amount = convert_to_xlm(amount, currency, rates)
+
+        route = None
+        if deliver_currency != 'XLM':
+            try:
+                route = path_finder.send_route(Asset.native(), amount, FIAT_ANCHORS[deliver_currency])
+            except Exception as e:
+                flash(f"Payment failed: {e}", "danger")
+                return redirect(url_for('send_payment'))
+
+        # Show conversion preview and lock its rate (and the route's minimum delivery) for the submit
         if 'preview' in request.form:
-            xlm_rate = get_xlm_price(recipient_currency)
-            converted_amount = amount * xlm_rate
+            quote = issue_quote(user.id, dest_public, amount, recipient_currency, rates, deliver_currency,
+                                deliver_min=route['dest_min'] if route else None)
+            if route:
+                # The path payment delivers the anchor asset, so show what it guarantees
+                converted_amount, currency = route['dest_min'], deliver_currency
+            else:
+                converted_amount = convert_to_local(amount, recipient_currency, rates)
+                currency = recipient_currency
             return render_template('send_payment.html',
                 preview=True,
-                amount=amount,
+                quote_id=quote.id,
+                expires_in=QUOTE_TTL,
+                amount=from_stroops(amount),
                 dest=dest_public,
-                converted_amount=converted_amount,
-                currency=recipient_currency
+                converted_amount=from_stroops(converted_amount),
+                currency=currency,
+                at_least=route is not None
             )
 
+    if request.method == "POST":
         # Actual payment logic
         try:
             source_kp = Keypair.from_secret(user.stellar_secret_key)
-            source_account = server.load_account(user.stellar_public_key)
-
-            tx = TransactionBuilder(
-                source_account=source_account,
-                network_passphrase=NETWORK_PASSPHRASE,
-                base_fee=get_base_fee()
-            ).append_payment_op(
-                destination=dest_public,
-                asset=Asset.native(),
-                amount=str(amount)
-            ).set_timeout(30).build()
-
-            tx.sign(source_kp)
-            response = server.submit_transaction(tx)
-
-            flash(f"Sent {amount:.2f} XLM ({convert_to_local(amount, recipient_currency):.2f} {recipient_currency})", "success")
+
+            def append_ops(builder, op_source):
+                if route is None:
+                    builder.append_payment_op(
+                        destination=dest_public,
+                        asset=Asset.native(),
+                        amount=format_stroops(amount),
+                        source=op_source
+                    )
+                else:
+                    builder.append_path_payment_strict_send_op(
+                        destination=dest_public,
+                        send_asset=Asset.native(),
+                        send_amount=format_stroops(route['send_amount']),
+                        dest_asset=FIAT_ANCHORS[deliver_currency],
+                        dest_min=format_stroops(route['dest_min']),
+                        path=route['path'],
+                        source=op_source
+                    )
+
+            # Queued for a background worker; the request does not wait for the ledger to close
+            job_id = enqueue_payment_ops(source_kp, append_ops, owner=str(user.id))
+            balance_cache.invalidate(user.stellar_public_key)
+            balance_cache.invalidate(dest_public)
+
+            if route is None:
+                received = f"{from_stroops(convert_to_local(amount, recipient_currency, rates)):.2f} {recipient_currency}"
+            else:
+                received = f"at least {from_stroops(route['dest_min']):.2f} {deliver_currency}"
+            flash(f"Submitted {from_stroops(amount):.2f} XLM ({received}), payment ID {job_id}", "success")
             return redirect(url_for('index'))
         except Exception as e:
             flash(f"Payment failed: {e}", "danger")
 
-    return render_template('send_payment.html', balance=get_stellar_balance(user.stellar_public_key))
+    return render_template('send_payment.html',
+        balance=from_stroops(get_stellar_balance(user.stellar_public_key)),
+        deliver_currencies=['XLM'] + sorted(FIAT_ANCHORS)
+    )
+
+@app.route('/api/convert', methods=['POST'])
+def bulk_convert():
+    """Convert a batch of amounts between currencies in one call.
+
+    Expects JSON ``{"amounts": [...], "from": "KES" | [...], "to": "INR" | [...]}``.
+    """
+    if not session.get('user_id'):
+        return jsonify({"error": "Authentication required"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        amounts = [to_stroops(amount) for amount in payload['amounts']]
+        cross_rates = get_cross_rates()
+        requested = {c.upper() for key in ('from', 'to')
+                     for c in ([payload[key]] if isinstance(payload[key], str) else payload[key])}
+        unavailable = (requested & set(SUPPORTED_CURRENCIES)) - set(cross_rates.currencies)
+        if unavailable:
+            return jsonify({"error": str(RateUnavailable(unavailable))}), 503
+        converted = cross_rates.convert_many(amounts, payload['from'], payload['to'])
+    except (KeyError, TypeError, ValueError, AttributeError, ArithmeticError) as e:
+        return jsonify({"error": f"Invalid conversion request: {e}"}), 400
+    return jsonify({"amounts": [format_stroops(amount) for amount in converted]})
+
+@app.route('/api/payouts', methods=['POST'])
+def bulk_payout():
+    """Pay many recipients from the logged-in account, up to 100 payments per transaction.
+
+    Accepts JSON ``{"payments": [{"destination", "amount", "currency"}, ...]}``
+    or a CSV upload (``file``) / ``text/csv`` body of ``destination,amount,currency``.
+    Results are reported per row.
+    """
+    if not session.get('user_id'):
+        return jsonify({"error": "Authentication required"}), 401
+
+    user = User.query.get(session['user_id'])
+    try:
+        if 'file' in request.files:
+            rows = read_csv(request.files['file'].read().decode('utf-8'))
+        elif request.mimetype == 'text/csv':
+            rows = read_csv(request.get_data().decode('utf-8'))
+        else:
+            rows = (request.get_json(silent=True) or {}).get('payments')
+    except UnicodeDecodeError:
+        return jsonify({"error": "CSV must be UTF-8 encoded"}), 400
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "No payments supplied"}), 400
+    if len(rows) > MAX_PAYOUT_ROWS:
+        return jsonify({"error": f"At most {MAX_PAYOUT_ROWS} payments per request"}), 400
+
+    valid, errors = validate_rows(rows, requires_memo=lambda destination: memo_required(server, destination))
+    results = {error['row']: error for error in errors}
+
+    # One rates snapshot prices every row, then amounts are settled in XLM
+    rates = get_rates(sorted({currency for _, _, _, currency in valid if currency in SUPPORTED_CURRENCIES}),
+                      partial=True)
+    payouts = []
+    for row, destination, amount, currency in valid:
+        if currency != 'XLM' and currency not in SUPPORTED_CURRENCIES:
+            results[row] = {'row': row, 'status': 'invalid', 'error': f"Unsupported currency {currency}"}
+            continue
+        if currency != 'XLM' and currency not in rates:
+            results[row] = {'row': row, 'status': 'failed', 'error': str(RateUnavailable([currency]))}
+            continue
+        stroops = amount if currency == 'XLM' else convert_to_xlm(amount, currency, rates)
+        payouts.append((row, destination, stroops))
+
+    source_kp = Keypair.from_secret(user.stellar_secret_key)
+    base_fee = get_base_fee()
+    batches = list(chunked(payouts))
+    # Batches only overlap when channel accounts give each its own sequence number
+    if len(channel_pool) > 1:
+        outcomes = run_concurrently(*[
+            lambda batch=batch: submit_payout_batch(source_kp, batch, base_fee) for batch in batches
+        ])
+    else:
+        outcomes = [submit_payout_batch(source_kp, batch, base_fee) for batch in batches]
+    for outcome in outcomes:
+        for row, result in outcome.items():
+            results[row] = dict(result, row=row)
+
+    balance_cache.invalidate(user.stellar_public_key)
+    for _, destination, _ in payouts:
+        balance_cache.invalidate(destination)
+
+    ordered = [results[row] for row in sorted(results)]
+    return jsonify({
+        "sent": sum(1 for result in ordered if result['status'] == 'sent'),
+        "failed": sum(1 for result in ordered if result['status'] != 'sent'),
+        "transactions": len(batches),
+        "results": ordered
+    })
+
+@app.route('/api/submissions/<job_id>', methods=['GET'])
+def submission_status(job_id):
+    """Report the progress of a queued transaction: queued, submitting, pending, success or failed"""
+    if not session.get('user_id'):
+        return jsonify({"error": "Authentication required"}), 401
+
+    job = submission_queue.status(job_id)
+    if not job or job['owner'] != str(session['user_id']):
+        return jsonify({"error": "Unknown submission"}), 404
+    del job['owner']
+    return jsonify(job)
+
+@app.route('/api/rates/history', methods=['GET'])
+def rate_history():
+    """Return recorded XLM rates and their TWAP for charts and quote audits"""
+    if not session.get('user_id'):
+        return jsonify({"error": "Authentication required"}), 401
+
+    currency = request.args.get('currency', 'USD').upper()
+    end = request.args.get('end', type=int) or int(time.time())
+    start = request.args.get('start', type=int) or end - 24 * 3600
+    points = price_history.range(currency, start, end)
+    twap = price_history.twap(currency, start, end)
+    return jsonify({
+        "currency": currency,
+        "points": [[ts, format_stroops(rate)] for ts, rate in points],
+        "twap": format_stroops(twap) if twap is not None else None
+    })
 
 ##########################################################
 # Escrow Endpoint (Simplified Version)
@@ -301,80 +858,83 @@ def initiate_escrow():
         user_a_secret = request.form.get('user_a_secret')
         user_b_public = request.form.get('user_b_public')
         mediator_public = request.form.get('mediator_public')
-        amount = request.form.get('amount')
+        mode = request.form.get('mode') or 'account'
+        if mode not in ESCROW_MODES:
+            flash(f"Escrow failed: unknown escrow type {mode}", "danger")
+            return render_template('initiate_escrow.html')
         try:
+            amount = to_stroops(request.form.get('amount'))
             user_a_kp = Keypair.from_secret(user_a_secret)
             user_a_pub = user_a_kp.public_key
 
-            # Create and fund escrow account
-            escrow_kp = Keypair.random()
-            escrow_pub = escrow_kp.public_key
-            escrow_secret = escrow_kp.secret
-            fund_account(escrow_pub)
-            escrow_account = server.load_account(escrow_pub)
-
-            signer_a = Signer.ed25519_public_key(user_a_pub, weight=1)
-            signer_b = Signer.ed25519_public_key(user_b_public, weight=1)
-            signer_mediator = Signer.ed25519_public_key(mediator_public, weight=1)
-            base_fee = get_base_fee()
-
-            tx = TransactionBuilder(
-                source_account=escrow_account,
-                network_passphrase=NETWORK_PASSPHRASE,
-                base_fee=base_fee
-            ).append_operation(
-                SetOptions(
-                    master_weight=0,
-                    low_threshold=2,
-                    med_threshold=2,
-                    high_threshold=2,
-                    signer=signer_a
-                )
-            ).append_operation(
-                SetOptions(
-                    signer=signer_b
-                )
-            ).append_operation(
-                SetOptions(
-                    signer=signer_mediator
-                )
-            ).set_timeout(30).build()
-
-            tx.sign(escrow_kp)
-            server.submit_transaction(tx)
-
-            user_a_account = server.load_account(user_a_pub)
-            payment_tx = TransactionBuilder(
-                source_account=user_a_account,
-                network_passphrase=NETWORK_PASSPHRASE,
-                base_fee=get_base_fee()
-            ).append_operation(
-                Payment(
-                    destination=escrow_pub,
-                    asset=Asset.native(),
-                    amount=str(amount)
+            deadline = datetime.utcnow() + timedelta(minutes=60)
+            deadline_ts = int(deadline.replace(tzinfo=timezone.utc).timestamp())
+            escrow_pub = escrow_secret = balance_id = release_xdr = refund_xdr = None
+            if mode == 'claimable_balance':
+                # A single claimable balance: the receiver claims before the deadline,
+                # the sender reclaims after it; no account, reserve or secret to keep
+                response = submit_payment_ops(user_a_kp, lambda builder, op_source: append_claimable_escrow(
+                    builder, user_b_public, user_a_pub, amount, deadline_ts, funder=op_source
+                ))
+                envelope = TransactionEnvelope.from_xdr(response['envelope_xdr'], NETWORK_PASSPHRASE)
+                balance_id = envelope.transaction.get_claimable_balance_id(0)
+            else:
+                # One transaction from the sender funds and locks the escrow, so there is
+                # never a half-created escrow to clean up. A pooled account already holds
+                # its reserve; otherwise the same transaction creates the account.
+                signer_keys = [user_a_pub, user_b_public, mediator_public]
+                pooled = escrow_pool.lease() if ESCROW_POOL_SIZE else None
+                escrow_kp = pooled[0] if pooled else Keypair.random()
+                escrow_pub = escrow_kp.public_key
+                escrow_secret = escrow_kp.secret
+                append_setup = append_pooled_escrow_setup if pooled else append_escrow_setup
+                try:
+                    response = submit_payment_ops(user_a_kp, lambda builder, op_source: append_setup(
+                        builder, escrow_pub, amount, signer_keys, funder=op_source
+                    ), cosigners=[escrow_kp])
+                except Exception:
+                    if pooled:
+                        escrow_pool.release(*pooled)
+                    raise
+
+                # The escrow's next sequence is known (a new account starts at ledger << 32),
+                # so release and refund can be built now and later settle with a single
+                # submit, no load_account or rebuild
+                escrow_sequence = pooled[1] if pooled else response['ledger'] << 32
+                # A pooled account's reserve goes back to the treasury that funded it
+                reserve_owner = Keypair.from_secret(TREASURY_SECRET).public_key if pooled and TREASURY_SECRET else None
+                release, refund = build_settlements(
+                    escrow_pub, escrow_sequence, user_b_public, user_a_pub, amount,
+                    deadline_ts, get_base_fee('high'), NETWORK_PASSPHRASE, reserve_owner
                 )
-            ).set_timeout(30).build()
+                # The sender signs the refund up front; it still needs a second signer
+                refund.sign(user_a_kp)
+                release_xdr, refund_xdr = release.to_xdr(), refund.to_xdr()
 
-            payment_tx.sign(user_a_kp)
-            server.submit_transaction(payment_tx)
-
-            deadline = (datetime.utcnow() + timedelta(minutes=60)).isoformat()
             new_escrow = Escrow(
                 sender_id=session.get('user_id'),
                 receiver_public_key=user_b_public,
                 mediator_public_key=mediator_public,
+                mode=mode,
                 escrow_public_key=escrow_pub,
                 escrow_secret_key=escrow_secret,
-                amount=amount,
+                balance_id=balance_id,
+                sender_public_key=user_a_pub,
+                release_xdr=release_xdr,
+                refund_xdr=refund_xdr,
+                amount_stroops=amount,
                 status='pending',
-                deadline=datetime.fromisoformat(deadline),
+                deadline=deadline,
                 approvals=0
             )
             db.session.add(new_escrow)
             db.session.commit()
-            flash(f'Escrow created! Account: {escrow_pub}. Deadline for approvals: {deadline}', "success")
-            return render_template("escrow_created.html", escrow_pub=escrow_pub, escrow_secret=escrow_secret, deadline=deadline)
+            # The sender's balance just paid for the escrow, in either mode
+            balance_cache.invalidate(user_a_pub)
+            flash(f'Escrow created! {balance_id or escrow_pub}. Deadline for approvals: {deadline.isoformat()}', "success")
+            return render_template("escrow_created.html", escrow=new_escrow, deadline=deadline.isoformat())
+        except InvalidOperation:
+            flash("Escrow failed: enter a valid amount", "danger")
         except Exception as e:
             flash(f"Escrow failed: {str(e)}", "danger")
     return render_template('initiate_escrow.html')
@@ -394,6 +954,25 @@ def approve_escrow(escrow_id):
         flash("Escrow deadline reached. Escrow is now locked.", "danger")
         return redirect(url_for('index'))
 
+    if request.method == "POST" and escrow.release_xdr and escrow.status in ('pending', 'locked'):
+        # Sign the pre-built release (or, after the deadline, refund) with the approver's key
+        user = User.query.get(session['user_id']) if session.get('user_id') else None
+        try:
+            signer_kp = Keypair.from_secret(request.form.get('signer_secret') or user.stellar_secret_key)
+            signatures, settled = sign_escrow_settlement(escrow, signer_kp)
+        except Exception as e:
+            # Signatures already added are kept, so a failed submit can be retried
+            db.session.commit()
+            flash(f"Approval failed: {e}", "danger")
+            return redirect(url_for('approve_escrow', escrow_id=escrow_id))
+        db.session.commit()
+        if settled:
+            flash(f"Escrow {escrow.status}! Funds have been disbursed.", "success")
+        else:
+            flash(f"Your signature has been recorded ({signatures}/{APPROVAL_THRESHOLD}). "
+                  "Waiting for additional approvals.", "info")
+        return redirect(url_for('approve_escrow', escrow_id=escrow_id))
+
     if request.method == "POST":
         # Register an approval (you might later associate which party approved)
         escrow.approvals += 1
@@ -415,6 +994,53 @@ def approve_escrow(escrow_id):
     return render_template('approve_escrow.html', escrow=escrow, remaining_seconds=remaining_seconds)
 
 
+@app.route('/claim-escrow/<int:escrow_id>', methods=['POST'])
+def claim_escrow(escrow_id):
+    """Claim a claimable-balance escrow: the receiver before the deadline, the sender after it"""
+    if not session.get('user_id'):
+        return redirect(url_for('login'))
+
+    user = User.query.get(session['user_id'])
+    escrow = Escrow.query.get(escrow_id)
+    if not escrow or escrow.mode != 'claimable_balance' or escrow.status not in ('pending', 'approved', 'locked'):
+        flash("Escrow cannot be claimed", "danger")
+        return redirect(url_for('index'))
+
+    if escrow.is_expired():
+        allowed, status = escrow.sender_id == user.id, 'refunded'
+    else:
+        allowed, status = escrow.receiver_public_key == user.stellar_public_key, 'released'
+    if not allowed:
+        flash("Only the receiver before the deadline, or the sender after it, can claim this escrow", "danger")
+        return redirect(url_for('approve_escrow', escrow_id=escrow_id))
+
+    try:
+        submit_payment_ops(Keypair.from_secret(user.stellar_secret_key), lambda builder, op_source:
+            builder.append_operation(ClaimClaimableBalance(balance_id=escrow.balance_id, source=op_source)))
+    except Exception as e:
+        flash(f"Claim failed: {e}", "danger")
+        return redirect(url_for('approve_escrow', escrow_id=escrow_id))
+
+    escrow.status = status
+    db.session.commit()
+    balance_cache.invalidate(user.stellar_public_key)
+    flash(f"Escrow {status}: {from_stroops(escrow.amount_stroops):.2f} XLM", "success")
+    return redirect(url_for('index'))
+
+def pending_escrows_for(user):
+    """Query the pending escrows ``user`` is a party to, soonest deadline first.
+
+    One UNION branch per party column, so each is served by its own partial
+    index instead of an OR forcing a full table scan. Only the IDs are
+    unioned, so de-duplication never compares the escrows' XDR blobs.
+    """
+    pending = db.session.query(Escrow.id).filter(ESCROW_PENDING)
+    ids = pending.filter(Escrow.sender_id == user.id).union(
+        pending.filter(Escrow.receiver_public_key == user.stellar_public_key),
+        pending.filter(Escrow.mediator_public_key == user.stellar_public_key)
+    )
+    return Escrow.query.filter(Escrow.id.in_(ids)).order_by(Escrow.deadline)
+
 @app.route('/escrow-approvals', methods=['GET'])
 def escrow_approvals():
     # Ensure the user is logged in before accessing escrow approvals
@@ -428,15 +1054,8 @@ def escrow_approvals():
         flash("User not found", "danger")
         return redirect(url_for('login'))
 
-    # Query escrow records that are pending and involve the current user in some capacity.
-    pending_escrows = Escrow.query.filter(
-        Escrow.status == 'pending',
-        or_(
-            Escrow.sender_id == user.id,
-            Escrow.receiver_public_key == user.stellar_public_key,
-            Escrow.mediator_public_key == user.stellar_public_key
-        )
-    ).all()
+    # Query escrow records that are pending and involve the current user in some capacity
+    pending_escrows = pending_escrows_for(user).all()
 
     return render_template('escrow_approvals.html', escrows=pending_escrows)
 
@@ -457,19 +1076,50 @@ def index():
     user_id = session.get('user_id')
     if user_id:
         user = User.query.get(user_id)
-        balance = get_stellar_balance(user.stellar_public_key)
+        # Both are in-memory cache reads, kept current in the background
+        balance = from_stroops(get_stellar_balance(user.stellar_public_key))
+        xlm_rate = get_display_rate(user.local_currency)
 
         user_keys = {
             'public_key': user.stellar_public_key,
             'secret_key': user.stellar_secret_key,
             'balance': balance,
             'local_currency': user.local_currency,
-            'xlm_rate': get_xlm_price(user.local_currency)
+            'xlm_rate': xlm_rate,
+            'rate_stale': bool(price_cache.stale_currencies([user.local_currency]))
         }
         return render_template('index.html', user_keys=user_keys)
     else:
         return redirect(url_for('login'))
 
+async def index_async():
+    """``index`` for ASYNC_HORIZON mode.
+
+    A balance cache miss loads over ServerAsync while the rate is read on a
+    worker thread, so the page waits for the slower of the two, not both.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return redirect(url_for('login'))
+    user = User.query.get(user_id)
+    balance, xlm_rate = await asyncio.gather(
+        get_stellar_balance_async(user.stellar_public_key),
+        asyncio.to_thread(get_display_rate, user.local_currency)
+    )
+    user_keys = {
+        'public_key': user.stellar_public_key,
+        'secret_key': user.stellar_secret_key,
+        'balance': from_stroops(balance),
+        'local_currency': user.local_currency,
+        'xlm_rate': xlm_rate,
+        'rate_stale': bool(price_cache.stale_currencies([user.local_currency]))
+    }
+    return render_template('index.html', user_keys=user_keys)
+
+if ASYNC_HORIZON:
+    # Flask runs async views through asgiref (flask[async])
+    app.view_functions['index'] = index_async
+
 # Add new routes for fiat deposits
 @app.route('/deposit/mpesa', methods=['GET', 'POST'])
 def mpesa_deposit():
@@ -478,24 +1128,24 @@ def mpesa_deposit():
 
     user = User.query.get(session['user_id'])
     if request.method == 'POST':
-        amount = Decimal(request.form.get('amount'))
-
-        # Convert KES to XLM
-        xlm_amount = convert_to_xlm(amount, 'KES')
-
         # In real implementation: Call M-Pesa API here
         # For simulation, we'll directly fund the account
         try:
+            amount = to_stroops(request.form.get('amount'))
+            # Convert KES to XLM
+            xlm_amount = convert_to_xlm(amount, 'KES')
             source_kp = Keypair.from_secret(user.stellar_secret_key)
             server.load_account(user.stellar_public_key)
 
             # Simulate receiving XLM (in real system, this would come from your XLM reserve)
-            flash(f"Simulated M-Pesa deposit: {amount} KES converted to {xlm_amount:.2f} XLM", "success")
+            flash(f"Simulated M-Pesa deposit: {from_stroops(amount):.2f} KES converted to {from_stroops(xlm_amount):.2f} XLM", "success")
             return redirect(url_for('index'))
+        except InvalidOperation:
+            flash("Deposit failed: enter a valid amount", "danger")
         except Exception as e:
             flash(f"Deposit failed: {str(e)}", "danger")
 
-    return render_template('mpesa_deposit.html', rate=get_xlm_price('KES'))
+    return render_template('mpesa_deposit.html', rate=get_display_rate('KES'))
 
 @app.route('/deposit/airtel', methods=['GET', 'POST'])
 def airtel_deposit():
@@ -504,22 +1154,22 @@ def airtel_deposit():
 
     user = User.query.get(session['user_id'])
     if request.method == 'POST':
-        amount = Decimal(request.form.get('amount'))
-
-        # Convert INR to XLM
-        xlm_amount = convert_to_xlm(amount, 'INR')
-
         # Simulate Airtel payment
         try:
+            amount = to_stroops(request.form.get('amount'))
+            # Convert INR to XLM
+            xlm_amount = convert_to_xlm(amount, 'INR')
             source_kp = Keypair.from_secret(user.stellar_secret_key)
             server.load_account(user.stellar_public_key)
 
-            flash(f"Simulated Airtel deposit: {amount} INR converted to {xlm_amount:.2f} XLM", "success")
+            flash(f"Simulated Airtel deposit: {from_stroops(amount):.2f} INR converted to {from_stroops(xlm_amount):.2f} XLM", "success")
             return redirect(url_for('index'))
+        except InvalidOperation:
+            flash("Deposit failed: enter a valid amount", "danger")
         except Exception as e:
             flash(f"Deposit failed: {str(e)}", "danger")
 
-    return render_template('airtel_deposit.html', rate=get_xlm_price('INR'))
+    return render_template('airtel_deposit.html', rate=get_display_rate('INR'))
 
 if __name__ == '__main__':
     app.run(debug=True)
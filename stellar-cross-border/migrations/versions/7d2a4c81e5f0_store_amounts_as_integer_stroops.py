@@ -0,0 +1,53 @@
+"""Store escrow and quote amounts as integer stroops
+
+Revision ID: 7d2a4c81e5f0
+Revises: 3c9e1f7a2b64
+Create Date: 2026-10-18 10:02:47.118930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a4c81e5f0'
+down_revision = '3c9e1f7a2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('escrow', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amount_stroops', sa.BigInteger(), nullable=True))
+
+    op.execute('UPDATE escrow SET amount_stroops = CAST(ROUND(amount * 10000000) AS INTEGER)')
+
+    with op.batch_alter_table('escrow', schema=None) as batch_op:
+        batch_op.alter_column('amount_stroops', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('amount')
+
+    # Quotes live for a minute, so outstanding ones are simply dropped
+    op.execute('DELETE FROM quote')
+    with op.batch_alter_table('quote', schema=None) as batch_op:
+        batch_op.drop_column('xlm_amount')
+        batch_op.drop_column('recipient_rate')
+        batch_op.add_column(sa.Column('amount_stroops', sa.BigInteger(), nullable=False))
+        batch_op.add_column(sa.Column('recipient_rate', sa.BigInteger(), nullable=False))
+
+
+def downgrade():
+    op.execute('DELETE FROM quote')
+    with op.batch_alter_table('quote', schema=None) as batch_op:
+        batch_op.drop_column('recipient_rate')
+        batch_op.drop_column('amount_stroops')
+        batch_op.add_column(sa.Column('xlm_amount', sa.String(length=40), nullable=False))
+        batch_op.add_column(sa.Column('recipient_rate', sa.String(length=40), nullable=False))
+
+    with op.batch_alter_table('escrow', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amount', sa.Float(), nullable=True))
+
+    op.execute('UPDATE escrow SET amount = amount_stroops / 10000000.0')
+
+    with op.batch_alter_table('escrow', schema=None) as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('amount_stroops')
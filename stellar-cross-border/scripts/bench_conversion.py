@@ -0,0 +1,64 @@
+"""Benchmark: /api/convert's batch path vs a per-item Decimal loop.
+
+Times each stage the way POST /api/convert runs it: parsing the amount
+strings, converting, and formatting the results.
+Run from stellar-cross-border/:  python scripts/bench_conversion.py
+"""
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.conversion import CrossRates  # noqa: E402
+from src.money import format_stroops, to_stroops  # noqa: E402
+
+BATCHES = (10_000, 50_000)
+RATES = {'USD': Decimal('0.1123'), 'KES': Decimal('14.2731'), 'INR': Decimal('9.4412'), 'AED': Decimal('0.4125')}
+PAIRS = [('KES', 'INR'), ('KES', 'AED'), ('USD', 'KES'), ('INR', 'AED')]
+SEVEN_PLACES = Decimal('0.0000001')
+
+
+def best(call):
+    return min(timeit.repeat(call, number=1, repeat=5)) * 1000
+
+
+def run(size):
+    random.seed(size)
+    amounts = [f"{random.randint(1, 1_000_000)}.{random.randint(0, 99):02d}" for _ in range(size)]
+    sources, targets = zip(*(random.choice(PAIRS) for _ in range(size)))
+    cross_rates = CrossRates(RATES)
+    units = [to_stroops(amount) for amount in amounts]
+    converted = cross_rates.convert_many(units, sources, targets)
+    parsed = [Decimal(amount) for amount in amounts]
+
+    def decimal_convert():
+        return [(amount / RATES[source] * RATES[target]).quantize(SEVEN_PLACES)
+                for amount, source, target in zip(parsed, sources, targets)]
+
+    def decimal_end_to_end():
+        return [str((Decimal(amount) / RATES[source] * RATES[target]).quantize(SEVEN_PLACES))
+                for amount, source, target in zip(amounts, sources, targets)]
+
+    def batch_end_to_end():
+        values = cross_rates.convert_many([to_stroops(amount) for amount in amounts], sources, targets)
+        return [format_stroops(value) for value in values]
+
+    print(f"{size} amounts across {len(PAIRS)} currency pairs (ms, best of 5):")
+    print(f"  parse      to_stroops             {best(lambda: [to_stroops(a) for a in amounts]):7.1f}")
+    print(f"  convert    per-item Decimal       {best(decimal_convert):7.1f}")
+    print(f"  convert    CrossRates.convert_many{best(lambda: cross_rates.convert_many(units, sources, targets)):7.1f}")
+    print(f"  format     format_stroops         {best(lambda: [format_stroops(v) for v in converted]):7.1f}")
+    print(f"  end to end per-item Decimal       {best(decimal_end_to_end):7.1f}")
+    print(f"  end to end batch path             {best(batch_end_to_end):7.1f}")
+
+
+def main():
+    for size in BATCHES:
+        run(size)
+
+
+if __name__ == '__main__':
+    main()
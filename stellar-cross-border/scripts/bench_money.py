@@ -0,0 +1,44 @@
+"""Micro-benchmark: Decimal conversions vs the integer-stroop path in src/money.py.
+
+Run from stellar-cross-border/:  python scripts/bench_money.py
+"""
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.money import from_stroops, local_to_xlm, to_stroops  # noqa: E402
+
+CONVERSIONS = 200_000
+SUM_TERMS = 100_000
+
+amount, rate = Decimal('1234.56'), Decimal('14.2731')
+amount_units, rate_units = to_stroops(amount), to_stroops(rate)
+
+
+def decimal_path():
+    for _ in range(CONVERSIONS):
+        (amount / rate).quantize(Decimal('0.0000001'))
+
+
+def integer_path():
+    for _ in range(CONVERSIONS):
+        local_to_xlm(amount_units, rate_units)
+
+
+def main():
+    print(f"{CONVERSIONS} local -> XLM conversions, best of 5:")
+    print(f"  Decimal divide + quantize  {min(timeit.repeat(decimal_path, number=1, repeat=5)):.3f}s")
+    print(f"  integer stroops            {min(timeit.repeat(integer_path, number=1, repeat=5)):.3f}s")
+
+    float_total = sum(0.1 for _ in range(SUM_TERMS))
+    stroop_total = sum(to_stroops('0.1') for _ in range(SUM_TERMS))
+    print(f"Sum of {SUM_TERMS} x 0.1:")
+    print(f"  float    {float_total!r}")
+    print(f"  stroops  {from_stroops(stroop_total)}")
+
+
+if __name__ == '__main__':
+    main()
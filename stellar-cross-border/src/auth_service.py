@@ -1,7 +1,9 @@
-from stellar_sdk import Keypair, Server
+from stellar_sdk import Keypair
 from models import db, User
 from werkzeug.security import check_password_hash
-import os
+from http_client import default_client
+
+FRIENDBOT_URL = "https://friendbot.stellar.org"
 
 def create_user_account(username, email, password):
     if User.query.filter((User.username == username) | (User.email == email)).first():
@@ -11,10 +13,8 @@ def create_user_account(username, email, password):
     public_key = keypair.public_key
     secret_key = keypair.secret
 
-    # Activate testnet account via Friendbot
-    server = Server("https://horizon-testnet.stellar.org")
-    friendbot_url = f"https://friendbot.stellar.org?addr={public_key}"
-    os.system(f"curl -s '{friendbot_url}' > /dev/null")
+    # Activate testnet account via Friendbot over the shared connection pool
+    default_client.get(FRIENDBOT_URL, params={'addr': public_key})
 
     user = User(
         username=username,
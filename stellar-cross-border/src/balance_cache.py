@@ -0,0 +1,108 @@
+import threading
+import time
+
+DEFAULT_TTL = 30  # seconds a balance is trusted when no healthy stream covers it
+STREAM_IDLE = 900  # streams for accounts not read within this window shut down
+MAX_STREAMS = 200  # cap on concurrent SSE connections held open
+STREAM_RETRY = 5  # seconds before a failed stream reconnects
+
+
+class BalanceCache:
+    """Per-account balance cache kept current by Horizon payment streams.
+
+    The first read of an account loads its balance and opens a
+    ``payments().for_account(...).stream()`` for it. While that stream is
+    healthy, reads are served from memory and only a payment event causes a
+    reload. If the stream drops, or the stream cap is reached, entries fall
+    back to a plain TTL until the stream reconnects.
+    """
+
+    def __init__(self, server, loader, ttl=DEFAULT_TTL, stream_idle=STREAM_IDLE, max_streams=MAX_STREAMS):
+        self.server = server
+        self._loader = loader  # public_key -> balance
+        self.ttl = ttl
+        self.stream_idle = stream_idle
+        self.max_streams = max_streams
+        self._entries = {}  # public_key -> (balance, loaded_at)
+        self._last_read = {}
+        self._streams = {}  # public_key -> True while healthy, False while reconnecting
+        self._lock = threading.Lock()
+
+    def cached(self, public_key):
+        """Return the balance if it can be served from memory, else None"""
+        now = time.monotonic()
+        with self._lock:
+            self._last_read[public_key] = now
+            entry = self._entries.get(public_key)
+            healthy = self._streams.get(public_key) is True
+        if entry is not None and (healthy or now - entry[1] < self.ttl):
+            return entry[0]
+        return None
+
+    def get(self, public_key):
+        """Return the cached balance for ``public_key``, loading it when needed"""
+        balance = self.cached(public_key)
+        if balance is None:
+            balance = self.refresh(public_key)
+            self._ensure_stream(public_key)
+        return balance
+
+    async def get_async(self, public_key, load):
+        """Like ``get``, but a miss awaits ``load(public_key)`` instead of the blocking loader"""
+        balance = self.cached(public_key)
+        if balance is None:
+            balance = self.store(public_key, await load(public_key))
+            self._ensure_stream(public_key)
+        return balance
+
+    def refresh(self, public_key):
+        return self.store(public_key, self._loader(public_key))
+
+    def store(self, public_key, balance):
+        with self._lock:
+            self._entries[public_key] = (balance, time.monotonic())
+        return balance
+
+    def invalidate(self, public_key):
+        """Drop the cached balance, e.g. right after submitting from this account"""
+        with self._lock:
+            self._entries.pop(public_key, None)
+
+    def _ensure_stream(self, public_key):
+        with self._lock:
+            if public_key in self._streams or len(self._streams) >= self.max_streams:
+                return
+            self._streams[public_key] = False
+        threading.Thread(target=self._follow, args=(public_key,),
+                         name=f'balance-stream-{public_key[:8]}', daemon=True).start()
+
+    def _is_idle(self, public_key):
+        with self._lock:
+            return time.monotonic() - self._last_read.get(public_key, 0) > self.stream_idle
+
+    def _follow(self, public_key):
+        try:
+            while not self._is_idle(public_key):
+                try:
+                    # Stream from the latest payment reflected in a fresh load, so nothing
+                    # that lands while the stream connects is missed
+                    page = self.server.payments().for_account(public_key).order(desc=True).limit(1).call()
+                    records = page['_embedded']['records']
+                    cursor = records[0]['paging_token'] if records else 'now'
+                    self.refresh(public_key)
+                    stream = self.server.payments().for_account(public_key).cursor(cursor).stream()
+                    with self._lock:
+                        self._streams[public_key] = True
+                    for _ in stream:
+                        self.refresh(public_key)
+                        if self._is_idle(public_key):
+                            return
+                except Exception:
+                    # Events may have been missed; fall back to TTL until we reconnect
+                    with self._lock:
+                        self._streams[public_key] = False
+                    self.invalidate(public_key)
+                    time.sleep(STREAM_RETRY)
+        finally:
+            with self._lock:
+                self._streams.pop(public_key, None)
@@ -0,0 +1,193 @@
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from stellar_sdk.exceptions import NotFoundError
+
+from src.money import to_stroops
+from src.sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_account (
+    public_key TEXT PRIMARY KEY,
+    healthy INTEGER NOT NULL DEFAULT 1,
+    lease_token TEXT,
+    leased_until REAL NOT NULL DEFAULT 0,
+    sequence INTEGER
+);
+"""
+
+MIN_CHANNEL_BALANCE = to_stroops(5)  # XLM kept in each channel to pay fees
+TOP_UP_AMOUNT = to_stroops(20)  # XLM sent when a channel falls below the minimum
+CHECK_INTERVAL = 60  # seconds between channel health checks
+LEASE_TIMEOUT = 5  # seconds a caller waits for a free channel
+LEASE_TTL = 120  # seconds before a lease held by a crashed process is taken back
+LEASE_POLL = 0.05  # seconds between attempts while every channel is leased
+
+
+class ChannelPool:
+    """Pool of funded channel accounts used as transaction sources.
+
+    A channel account is the transaction source and pays the fee and
+    sequence number, while the real account remains the source of the
+    payment ops. Each channel is leased to one submission at a time, so
+    one treasury account can have as many transactions in a ledger as
+    there are channels.
+
+    Leases live in a SQLite file shared by every worker process, so a
+    channel is never in use by two processes at once. A lease that is not
+    released within ``LEASE_TTL`` (its process died) expires. The last
+    sequence number used from a channel is stored with it and handed to
+    ``sequences`` (a ``SequenceManager``) on lease, so a process that
+    leases a channel after another one continues its sequence. A
+    background check tops up low channels and keeps unhealthy ones out of
+    rotation; it only runs in the process holding the store's owner lock,
+    so a low channel is topped up once, not once per worker.
+    """
+
+    def __init__(self, server, path, keypairs, top_up, sequences=None, min_balance=MIN_CHANNEL_BALANCE,
+                 top_up_amount=TOP_UP_AMOUNT, check_interval=CHECK_INTERVAL, lease_ttl=LEASE_TTL):
+        self.server = server
+        self.path = path
+        self._top_up = top_up  # (public_key, amount_stroops, exists) -> None
+        self._sequences = sequences
+        self.min_balance = min_balance
+        self.top_up_amount = top_up_amount
+        self.check_interval = check_interval
+        self.lease_ttl = lease_ttl
+        self._channels = {kp.public_key: kp for kp in keypairs}
+        self._tokens = {}  # public_key -> token of the lease this process holds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._db = SQLiteStore(path, SCHEMA)
+        self._connection().executemany(
+            'INSERT OR IGNORE INTO channel_account (public_key) VALUES (?)',
+            [(public_key,) for public_key in self._channels]
+        )
+
+    def _connection(self):
+        return self._db.connection()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def _take(self):
+        """Lease the longest-idle healthy channel; returns ``(public_key, sequence, token)`` or None"""
+        now = time.time()
+        token = uuid.uuid4().hex
+        keys = list(self._channels)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT public_key, sequence FROM channel_account WHERE healthy = 1 AND leased_until < ? '
+                f'AND public_key IN ({",".join("?" * len(keys))}) ORDER BY leased_until LIMIT 1',
+                (now, *keys)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE channel_account SET lease_token = ?, leased_until = ? WHERE public_key = ?',
+                    (token, now + self.lease_ttl, row[0])
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return (row[0], row[1], token) if row else None
+
+    def lease(self, timeout=LEASE_TIMEOUT):
+        """Take a healthy channel keypair out of the pool"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                taken = self._take()
+            except sqlite3.OperationalError:
+                taken = None  # another process holds the write lock
+            if taken is not None:
+                break
+            if time.monotonic() >= deadline:
+                raise RuntimeError("No channel account available")
+            time.sleep(LEASE_POLL)
+        public_key, sequence, token = taken
+        with self._lock:
+            self._tokens[public_key] = token
+        if self._sequences is not None:
+            # Whatever this process cached may predate another process's use of the channel
+            if sequence is None:
+                self._sequences.resync(public_key)
+            else:
+                self._sequences.adopt(public_key, sequence)
+        return self._channels[public_key]
+
+    def release(self, channel):
+        """Return a leased channel, recording the last sequence number this process used from it"""
+        with self._lock:
+            token = self._tokens.pop(channel.public_key, None)
+        sequence = self._sequences.current(channel.public_key) if self._sequences is not None else None
+        # Matching the token keeps an expired lease from freeing a channel someone else now holds
+        self._connection().execute(
+            'UPDATE channel_account SET lease_token = NULL, leased_until = 0, sequence = ? '
+            'WHERE public_key = ? AND lease_token = ?',
+            (sequence, channel.public_key, token)
+        )
+
+    def resync(self, public_key):
+        """Forget a channel's stored sequence number, e.g. after ``tx_bad_seq``"""
+        self._connection().execute(
+            'UPDATE channel_account SET sequence = NULL WHERE public_key = ?', (public_key,)
+        )
+
+    def mark_unhealthy(self, channel):
+        self._connection().execute(
+            'UPDATE channel_account SET healthy = 0 WHERE public_key = ?', (channel.public_key,)
+        )
+
+    @contextmanager
+    def leased(self):
+        channel = self.lease()
+        try:
+            yield channel
+        finally:
+            self.release(channel)
+
+    def _balance(self, public_key):
+        account = self.server.accounts().account_id(public_key).call()
+        for balance in account['balances']:
+            if balance['asset_type'] == 'native':
+                return to_stroops(balance['balance'])
+        return 0
+
+    def check(self):
+        """Top up low channels and return recovered ones to the pool"""
+        for public_key in self._channels:
+            try:
+                try:
+                    balance, exists = self._balance(public_key), True
+                except NotFoundError:
+                    balance, exists = 0, False
+                if balance < self.min_balance:
+                    self._top_up(public_key, self.top_up_amount, exists)
+            except Exception:
+                healthy = 0
+            else:
+                healthy = 1
+            self._connection().execute(
+                'UPDATE channel_account SET healthy = ? WHERE public_key = ?', (healthy, public_key)
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._db.try_lock():
+                try:
+                    self.check()
+                except sqlite3.OperationalError:
+                    pass  # the store is busy; check again next interval
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        threading.Thread(target=self._run, name='channel-health', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 32  # matches the Horizon connection pool size
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='horizon-io')
+
+
+def submit(call, *args, **kwargs):
+    """Start ``call`` on the shared I/O pool and return its Future"""
+    return _executor.submit(call, *args, **kwargs)
+
+
+def run_concurrently(*calls):
+    """Run zero-argument callables on the shared I/O pool and return their results in order.
+
+    Independent Horizon and price lookups overlap instead of running back to
+    back, so a route costs roughly its slowest call rather than the sum.
+    The first exception raised by any call is re-raised here.
+    """
+    futures = [_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
@@ -0,0 +1,59 @@
+from math import gcd
+
+from src.money import to_stroops
+
+
+class CrossRates:
+    """Precomputed cross-rate matrix between every pair of currencies.
+
+    Built from one XLM price snapshot (local units per XLM), so KES->INR is
+    priced via XLM as ``amount * rate[INR] / rate[KES]``. Each pair is stored
+    as a reduced integer fraction, and conversions are a single multiply and
+    floor-divide on 1e-7 fixed-point integers with no intermediate rounding.
+    """
+
+    def __init__(self, rates):
+        units = {c.upper(): to_stroops(rate) for c, rate in rates.items()}
+        units['XLM'] = to_stroops(1)
+        self.currencies = sorted(units)
+        self._matrix = {}
+        for source, source_units in units.items():
+            for target, target_units in units.items():
+                divisor = gcd(target_units, source_units)
+                self._matrix[source, target] = (target_units // divisor, source_units // divisor)
+
+    def pair(self, source, target):
+        """Return the ``(numerator, denominator)`` fraction for source->target"""
+        try:
+            return self._matrix[source.upper(), target.upper()]
+        except KeyError:
+            raise ValueError(f"Unsupported currency pair {source}->{target}")
+
+    def convert(self, amount_units, source, target):
+        """Convert one amount in 1e-7 units from ``source`` to ``target``"""
+        numerator, denominator = self.pair(source, target)
+        return amount_units * numerator // denominator
+
+    def convert_many(self, amounts, sources, targets):
+        """Convert a batch of amounts; ``sources``/``targets`` are a code or a list per amount.
+
+        Amounts are grouped by currency pair so each group is converted in
+        one comprehension with the pair's fraction looked up only once.
+        """
+        count = len(amounts)
+        sources = [sources] * count if isinstance(sources, str) else list(sources)
+        targets = [targets] * count if isinstance(targets, str) else list(targets)
+        if len(sources) != count or len(targets) != count:
+            raise ValueError("Amounts, sources and targets must be the same length")
+
+        groups = {}
+        for i, pair in enumerate(zip(sources, targets)):
+            groups.setdefault(pair, []).append(i)
+
+        results = [0] * count
+        for (source, target), indexes in groups.items():
+            numerator, denominator = self.pair(source, target)
+            converted = [amounts[i] * numerator // denominator for i in indexes]
+            for i, value in zip(indexes, converted):
+                results[i] = value
+        return results
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+
+from stellar_sdk import Asset
+
+from src.single_flight import SingleFlight
+
+LEDGER_CLOSE_SECONDS = 5  # how often the latest ledger sequence is re-checked
+BOOK_DEPTH = 20  # orderbook levels used for the depth-weighted price
+DEPTH_TARGET_XLM = Decimal('10000')  # liquidity each side of the book is weighted over
+TRADE_WINDOW_SECONDS = 3600  # rolling window for the trade VWAP
+AGGREGATION_RESOLUTION = 60000  # one-minute trade aggregations used for bootstrapping
+
+
+def _depth_weighted(levels, to_base, target):
+    """Average price of the first ``target`` XLM of one side of the book"""
+    filled, cost = Decimal('0'), Decimal('0')
+    for level in levels:
+        price = Decimal(level['price'])
+        size = min(to_base(level, price), target - filled)
+        filled += size
+        cost += size * price
+        if filled >= target:
+            break
+    return cost / filled if filled else None
+
+
+class TradeWindow:
+    """Rolling XLM/anchor VWAP maintained incrementally from new trades"""
+
+    def __init__(self, window=TRADE_WINDOW_SECONDS):
+        self.window = window
+        self.samples = deque()  # (timestamp, base_volume, counter_volume)
+        self.base_volume = Decimal('0')
+        self.counter_volume = Decimal('0')
+        self.cursor = None
+
+    def add(self, timestamp, base_volume, counter_volume):
+        self.samples.append((timestamp, base_volume, counter_volume))
+        self.base_volume += base_volume
+        self.counter_volume += counter_volume
+
+    def expire(self, now):
+        while self.samples and self.samples[0][0] < now - self.window:
+            _, base_volume, counter_volume = self.samples.popleft()
+            self.base_volume -= base_volume
+            self.counter_volume -= counter_volume
+
+    def vwap(self):
+        return self.counter_volume / self.base_volume if self.base_volume > 0 else None
+
+
+class DexRateEngine:
+    """Derives XLM/fiat rates from Stellar DEX liquidity, cached per ledger.
+
+    For each fiat anchor asset it reads the XLM orderbook once per ledger to
+    compute the mid and a depth-weighted price, and keeps a rolling trade
+    VWAP that is bootstrapped from ``trade_aggregations`` and then advanced
+    with only the trades that arrived since the last cursor. Callable as a
+    price provider: returns the depth-weighted price, falling back to the
+    mid and then the VWAP when one side of the book is empty.
+    """
+
+    def __init__(self, server, anchors):
+        self.server = server
+        self.anchors = anchors  # currency -> anchor Asset, e.g. {'USD': USDC}
+        self._ledger = None
+        self._ledger_checked_at = 0
+        self._quotes = {}  # currency -> quote dict for self._ledger
+        self._trades = {}  # currency -> TradeWindow
+        self._builds = SingleFlight()  # one in-flight quote build per currency
+        self._lock = threading.Lock()
+
+    def current_ledger(self):
+        """Return the latest closed ledger, asking Horizon at most once per close"""
+        now = time.monotonic()
+        if self._ledger is None or now - self._ledger_checked_at >= LEDGER_CLOSE_SECONDS:
+            page = self.server.ledgers().order(desc=True).limit(1).call()
+            self._ledger = page['_embedded']['records'][0]['sequence']
+            self._ledger_checked_at = now
+        return self._ledger
+
+    def _update_trades(self, currency, anchor):
+        window = self._trades.get(currency)
+        now = time.time()
+        if window is None:
+            window = TradeWindow()
+            # Follow-up polls page forward from the newest trade that exists now
+            # ('now' is only meaningful to a stream and would never advance here);
+            # with no trades yet, no cursor pages from the first trade ever made
+            newest = self.server.trades().for_asset_pair(base=Asset.native(), counter=anchor) \
+                .order(desc=True).limit(1).call()['_embedded']['records']
+            end_ms = int(now * 1000)
+            page = self.server.trade_aggregations(
+                base=Asset.native(), counter=anchor, resolution=AGGREGATION_RESOLUTION,
+                start_time=end_ms - TRADE_WINDOW_SECONDS * 1000, end_time=end_ms
+            ).limit(200).call()
+            for bucket in page['_embedded']['records']:
+                window.add(int(bucket['timestamp']) / 1000, Decimal(bucket['base_volume']),
+                           Decimal(bucket['counter_volume']))
+            window.cursor = newest[0]['paging_token'] if newest else None
+            self._trades[currency] = window
+        else:
+            page = self.server.trades().for_asset_pair(base=Asset.native(), counter=anchor) \
+                .cursor(window.cursor).order(desc=False).limit(200).call()
+            for trade in page['_embedded']['records']:
+                base, counter = Decimal(trade['base_amount']), Decimal(trade['counter_amount'])
+                if trade['base_asset_type'] != 'native':
+                    base, counter = counter, base
+                closed_at = datetime.fromisoformat(trade['ledger_close_time'].replace('Z', '+00:00'))
+                window.add(closed_at.timestamp(), base, counter)
+                window.cursor = trade['paging_token']
+        window.expire(now)
+        return window.vwap()
+
+    def _build_quote(self, currency, anchor, ledger):
+        book = self.server.orderbook(selling=Asset.native(), buying=anchor).limit(BOOK_DEPTH).call()
+        bids, asks = book['bids'], book['asks']
+        # Ask amounts are in XLM; bid amounts are in the anchor asset
+        best_bid = Decimal(bids[0]['price']) if bids else None
+        best_ask = Decimal(asks[0]['price']) if asks else None
+        bid_price = _depth_weighted(bids, lambda level, price: Decimal(level['amount']) / price, DEPTH_TARGET_XLM)
+        ask_price = _depth_weighted(asks, lambda level, price: Decimal(level['amount']), DEPTH_TARGET_XLM)
+        return {
+            'ledger': ledger,
+            'mid': (best_bid + best_ask) / 2 if bids and asks else None,
+            'depth_weighted': (bid_price + ask_price) / 2 if bids and asks else None,
+            'vwap': self._update_trades(currency, anchor),
+        }
+
+    def quote(self, currency):
+        """Return ``{'ledger', 'mid', 'depth_weighted', 'vwap'}`` for ``currency``'s anchor"""
+        currency = currency.upper()
+        anchor = self.anchors[currency]
+        ledger = self.current_ledger()
+        with self._lock:
+            cached = self._quotes.get(currency)
+        if cached is not None and cached['ledger'] == ledger:
+            return cached
+        # Horizon calls run outside self._lock; concurrent callers share one build per currency
+        return self._builds.do(currency, self._refresh_quote, currency, anchor, ledger)
+
+    def _refresh_quote(self, currency, anchor, ledger):
+        quote = self._build_quote(currency, anchor, ledger)
+        with self._lock:
+            self._quotes[currency] = quote
+        return quote
+
+    def __call__(self, currencies):
+        rates = {}
+        for currency in currencies:
+            if currency.upper() not in self.anchors:
+                continue
+            quote = self.quote(currency)
+            price = quote['depth_weighted'] or quote['mid'] or quote['vwap']
+            if price is not None:
+                rates[currency.upper()] = price
+        return rates
@@ -0,0 +1,139 @@
+from stellar_sdk import (
+    Account, Asset, Claimant, ClaimPredicate, CreateAccount, CreateClaimableBalance, Keypair, SetOptions, Signer,
+    TransactionBuilder
+)
+from stellar_sdk.exceptions import BadSignatureError
+
+from src.money import to_stroops, format_stroops
+
+BASE_RESERVE = to_stroops('0.5')  # XLM locked per ledger entry
+FEE_HEADROOM = to_stroops('0.5')  # left in the escrow to pay for its release transaction
+APPROVAL_THRESHOLD = 2  # signatures needed to move escrowed funds
+
+
+def escrow_starting_balance(amount_stroops, signer_count):
+    """Return what the escrow must be created with: the escrowed amount plus its minimum balance"""
+    return amount_stroops + (2 + signer_count) * BASE_RESERVE + FEE_HEADROOM
+
+
+def _append_lock(builder, escrow_public_key, signer_keys):
+    builder.append_operation(SetOptions(
+        master_weight=0,
+        low_threshold=APPROVAL_THRESHOLD,
+        med_threshold=APPROVAL_THRESHOLD,
+        high_threshold=APPROVAL_THRESHOLD,
+        signer=Signer.ed25519_public_key(signer_keys[0], weight=1),
+        source=escrow_public_key
+    ))
+    for key in signer_keys[1:]:
+        builder.append_operation(SetOptions(
+            signer=Signer.ed25519_public_key(key, weight=1),
+            source=escrow_public_key
+        ))
+
+
+def append_escrow_setup(builder, escrow_public_key, amount_stroops, signer_keys, funder=None):
+    """Append ops that create, fund and lock a multisig escrow account in one transaction.
+
+    ``funder`` is the op source for the ``create_account`` (None means the
+    transaction source). The ``SetOptions`` ops run as the new escrow
+    account, so the transaction must also be signed by the escrow keypair.
+    """
+    builder.append_operation(CreateAccount(
+        destination=escrow_public_key,
+        starting_balance=format_stroops(escrow_starting_balance(amount_stroops, len(signer_keys))),
+        source=funder
+    ))
+    _append_lock(builder, escrow_public_key, signer_keys)
+    return builder
+
+
+def append_pooled_escrow_setup(builder, escrow_public_key, amount_stroops, signer_keys, funder=None):
+    """Like ``append_escrow_setup`` for a pooled account that already holds its reserve.
+
+    The sender only pays in the escrowed amount.
+    """
+    builder.append_payment_op(
+        destination=escrow_public_key, asset=Asset.native(),
+        amount=format_stroops(amount_stroops), source=funder
+    )
+    _append_lock(builder, escrow_public_key, signer_keys)
+    return builder
+
+
+def append_claimable_escrow(builder, receiver, refund_to, amount_stroops, deadline, funder=None):
+    """Append one op that escrows ``amount_stroops`` XLM as a claimable balance.
+
+    ``receiver`` can claim it until ``deadline`` (a unix timestamp) and
+    ``refund_to`` can reclaim it from then on. No account is created, so
+    there is no reserve to fund and nothing to merge afterwards. The
+    balance ID follows from the transaction source and sequence number;
+    see ``Transaction.get_claimable_balance_id``.
+    """
+    before_deadline = ClaimPredicate.predicate_before_absolute_time(deadline)
+    builder.append_operation(CreateClaimableBalance(
+        asset=Asset.native(),
+        amount=format_stroops(amount_stroops),
+        claimants=[
+            Claimant(destination=receiver, predicate=before_deadline),
+            Claimant(destination=refund_to, predicate=ClaimPredicate.predicate_not(before_deadline)),
+        ],
+        source=funder
+    ))
+    return builder
+
+
+def build_settlements(escrow_public_key, escrow_sequence, receiver, refund_to, amount_stroops,
+                      deadline, base_fee, network_passphrase, reserve_owner=None):
+    """Pre-build the escrow's release and refund transactions, unsigned.
+
+    Both use the escrow's next sequence number, so only one of them can
+    ever land. The release pays ``receiver`` and returns the reserve to
+    ``reserve_owner`` (default ``refund_to``); it is only valid until
+    ``deadline`` (a unix timestamp). The refund returns the amount to
+    ``refund_to`` and the reserve to its owner, and is only valid from
+    ``deadline`` on. Returns ``(release, refund)`` envelopes.
+    """
+    reserve_owner = reserve_owner or refund_to
+    release = TransactionBuilder(
+        source_account=Account(escrow_public_key, escrow_sequence),
+        network_passphrase=network_passphrase,
+        base_fee=base_fee
+    ).append_payment_op(
+        destination=receiver, asset=Asset.native(), amount=format_stroops(amount_stroops)
+    ).append_account_merge_op(destination=reserve_owner).add_time_bounds(0, deadline).build()
+    refund = TransactionBuilder(
+        source_account=Account(escrow_public_key, escrow_sequence),
+        network_passphrase=network_passphrase,
+        base_fee=base_fee
+    )
+    if reserve_owner != refund_to:
+        refund.append_payment_op(destination=refund_to, asset=Asset.native(), amount=format_stroops(amount_stroops))
+    refund = refund.append_account_merge_op(destination=reserve_owner).add_time_bounds(deadline, 0).build()
+    return release, refund
+
+
+def signers_of(envelope, signer_keys):
+    """Return the subset of ``signer_keys`` with a valid signature on ``envelope``"""
+    tx_hash = envelope.hash()
+    signed = set()
+    for key in signer_keys:
+        keypair = Keypair.from_public_key(key)
+        for decorated in envelope.signatures:
+            if decorated.signature_hint != keypair.signature_hint():
+                continue
+            try:
+                keypair.verify(tx_hash, decorated.signature)
+            except BadSignatureError:
+                continue
+            signed.add(key)
+    return signed
+
+
+def add_signature(envelope, keypair, signer_keys):
+    """Add ``keypair``'s decorated signature to ``envelope`` and return how many signers have signed"""
+    if keypair.public_key not in signer_keys:
+        raise ValueError("This key is not a signer on the escrow")
+    if keypair.public_key not in signers_of(envelope, signer_keys):
+        envelope.sign(keypair)
+    return len(signers_of(envelope, signer_keys))
@@ -0,0 +1,162 @@
+import threading
+import time
+
+from stellar_sdk import Keypair
+from stellar_sdk.exceptions import NotFoundError
+
+from src.sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS escrow_pool_account (
+    public_key TEXT PRIMARY KEY,
+    secret TEXT NOT NULL,
+    sequence INTEGER,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+TARGET_SIZE = 10  # ready accounts kept in the pool
+REFILL_BATCH = 5  # accounts created per refill transaction
+REFILL_INTERVAL = 30  # seconds between refills
+MAX_IDLE = 7 * 24 * 3600  # accounts unused this long are merged back into the treasury
+
+# creating -> ready -> (leased out, row deleted)
+CREATING, READY = 'creating', 'ready'
+
+
+class EscrowAccountPool:
+    """Pre-created, pre-funded escrow accounts that ``initiate_escrow`` leases instantly.
+
+    A maintainer process (the one holding the SQLite store's owner lock,
+    like the rate store's writer) keeps ``target_size`` accounts funded with the
+    escrow reserve, creating up to ``refill_batch`` per transaction. Their
+    secrets and starting sequence numbers live in SQLite so a restart loses
+    nothing. Accounts that sit unused past ``max_idle``, or above the
+    target after it is lowered, are handed to ``reclaim_account`` to be
+    merged back.
+    """
+
+    def __init__(self, server, path, create_accounts, reclaim_account, target_size=TARGET_SIZE,
+                 refill_batch=REFILL_BATCH, refill_interval=REFILL_INTERVAL, max_idle=MAX_IDLE):
+        self.server = server
+        self.path = path
+        self._create_accounts = create_accounts  # [Keypair] -> {public_key: starting sequence}
+        self._reclaim_account = reclaim_account  # (Keypair, sequence) -> None; None disables reclaim
+        self.target_size = target_size
+        self.refill_batch = refill_batch
+        self.refill_interval = refill_interval
+        self.max_idle = max_idle
+        self._db = SQLiteStore(path, SCHEMA)
+        self._stop = threading.Event()
+
+    def _connection(self):
+        return self._db.connection()
+
+    def ready_count(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM escrow_pool_account WHERE status = ?', (READY,)
+        ).fetchone()[0]
+
+    def lease(self):
+        """Take a ready account out of the pool; returns ``(Keypair, sequence)`` or None if empty"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT public_key, secret, sequence FROM escrow_pool_account WHERE status = ? '
+                'ORDER BY created_at LIMIT 1', (READY,)
+            ).fetchone()
+            if row is not None:
+                conn.execute('DELETE FROM escrow_pool_account WHERE public_key = ?', (row[0],))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return (Keypair.from_secret(row[1]), row[2]) if row else None
+
+    def release(self, keypair, sequence):
+        """Put back an account whose escrow transaction did not go through"""
+        self._connection().execute(
+            'INSERT OR REPLACE INTO escrow_pool_account (public_key, secret, sequence, status, created_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (keypair.public_key, keypair.secret, sequence, READY, time.time())
+        )
+
+    def refill(self):
+        """Create one batch of accounts if the pool is below target"""
+        missing = min(self.target_size - self.ready_count(), self.refill_batch)
+        if missing <= 0:
+            return 0
+        keypairs = [Keypair.random() for _ in range(missing)]
+        conn = self._connection()
+        now = time.time()
+        # Secrets are stored before funding so a crash mid-create cannot strand funded accounts
+        conn.executemany(
+            'INSERT INTO escrow_pool_account (public_key, secret, sequence, status, created_at) VALUES (?, ?, NULL, ?, ?)',
+            [(kp.public_key, kp.secret, CREATING, now) for kp in keypairs]
+        )
+        # On failure the rows stay in CREATING: the transaction may still have landed
+        # (e.g. a timeout), so _recover() checks each account on-chain before dropping it
+        sequences = self._create_accounts(keypairs)
+        conn.executemany(
+            'UPDATE escrow_pool_account SET status = ?, sequence = ? WHERE public_key = ?',
+            [(READY, sequence, public_key) for public_key, sequence in sequences.items()]
+        )
+        return missing
+
+    def _recover(self):
+        """Resolve accounts left mid-create by a crash: keep them if they exist on-chain"""
+        conn = self._connection()
+        rows = conn.execute(
+            'SELECT public_key FROM escrow_pool_account WHERE status = ?', (CREATING,)
+        ).fetchall()
+        for public_key, in rows:
+            try:
+                sequence = self.server.load_account(public_key).sequence
+            except NotFoundError:
+                conn.execute('DELETE FROM escrow_pool_account WHERE public_key = ?', (public_key,))
+                continue
+            conn.execute(
+                'UPDATE escrow_pool_account SET status = ?, sequence = ? WHERE public_key = ?',
+                (READY, sequence, public_key)
+            )
+
+    def reclaim(self):
+        """Hand idle accounts, and any above the target size, to ``reclaim_account``"""
+        if self._reclaim_account is None:
+            return
+        conn = self._connection()
+        rows = conn.execute(
+            'SELECT public_key, secret, sequence, created_at FROM escrow_pool_account WHERE status = ? '
+            'ORDER BY created_at DESC', (READY,)
+        ).fetchall()
+        cutoff = time.time() - self.max_idle
+        for index, (public_key, secret, sequence, created_at) in enumerate(rows):
+            if index < self.target_size and created_at >= cutoff:
+                continue
+            # Delete first so a concurrent lease cannot hand out an account being merged
+            if conn.execute('DELETE FROM escrow_pool_account WHERE public_key = ? AND status = ?',
+                            (public_key, READY)).rowcount == 0:
+                continue
+            keypair = Keypair.from_secret(secret)
+            try:
+                self._reclaim_account(keypair, sequence)
+            except Exception:
+                self.release(keypair, sequence)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._db.try_lock():
+                for step in (self._recover, self.reclaim, self.refill):
+                    try:
+                        step()
+                    except Exception:
+                        pass
+            self._stop.wait(self.refill_interval)
+
+    def start(self):
+        threading.Thread(target=self._run, name='escrow-pool', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
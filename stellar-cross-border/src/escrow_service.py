@@ -1,4 +1,5 @@
 from models import db, Escrow
+from money import to_stroops
 from datetime import datetime, timedelta
 
 def create_escrow(sender_id, receiver_id, mediator_id, amount, duration_minutes=60):
@@ -9,7 +10,7 @@ def create_escrow(sender_id, receiver_id, mediator_id, amount, duration_minutes=
         sender_id=sender_id,
         receiver_id=receiver_id,
         mediator_id=mediator_id,
-        amount=amount,
+        amount_stroops=to_stroops(amount),
         status='pending',
         deadline=deadline
     )
@@ -0,0 +1,74 @@
+import threading
+
+BASE_FEE = 100  # network minimum in stroops per operation
+MAX_FEE = 100_000  # stroops per operation we are willing to bid, even in a surge
+SURGE_CAPACITY = 0.9  # ledger_capacity_usage above which surge pricing is assumed
+REFRESH_INTERVAL = 5  # about one ledger close
+
+# Percentile of recent fees to bid for each urgency
+URGENCY_PERCENTILES = {'low': 'p50', 'normal': 'p90', 'high': 'p99'}
+
+
+class FeeOracle:
+    """Per-operation fee recommendations from Horizon ``fee_stats``.
+
+    ``fee_stats`` is fetched at most once per ledger by a background
+    refresher; after the first load, building a transaction only reads the
+    cached copy and never waits on a fee lookup. Normally the bid is a
+    percentile of the fees charged in recent ledgers. When ledgers are
+    close to full, fees charged lag the surge, so the bid moves to the same
+    percentile of the max fees other transactions offered, which is what it
+    takes to make the next ledger.
+    """
+
+    def __init__(self, server, current_ledger, max_fee=MAX_FEE):
+        self.server = server
+        self.current_ledger = current_ledger  # callable returning the latest ledger sequence
+        self.max_fee = max_fee
+        self._stats = None
+        self._ledger = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def refresh(self):
+        stats = self.server.fee_stats().call()
+        with self._lock:
+            self._stats = stats
+            self._ledger = int(stats['last_ledger'])
+        return stats
+
+    def stats(self):
+        """Return the cached ``fee_stats``; only the very first call fetches them"""
+        with self._lock:
+            stats = self._stats
+        return stats if stats is not None else self.refresh()
+
+    def recommend(self, urgency='normal'):
+        """Return the fee in stroops per operation to bid at ``urgency`` (low, normal or high)"""
+        percentile = URGENCY_PERCENTILES[urgency]
+        try:
+            stats = self.stats()
+        except Exception:
+            return BASE_FEE
+        floor = int(stats.get('last_ledger_base_fee', BASE_FEE))
+        surge = float(stats.get('ledger_capacity_usage', 0)) >= SURGE_CAPACITY
+        fees = stats['max_fee'] if surge else stats['fee_charged']
+        return min(max(int(fees[percentile]), floor), self.max_fee)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    ledger = self._ledger
+                # Refetch once a new ledger has closed; otherwise keep bidding from the last stats
+                if ledger is None or self.current_ledger() > ledger:
+                    self.refresh()
+            except Exception:
+                pass
+            self._stop.wait(REFRESH_INTERVAL)
+
+    def start(self):
+        threading.Thread(target=self._run, name='fee-oracle', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
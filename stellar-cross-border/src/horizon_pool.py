@@ -0,0 +1,134 @@
+import threading
+import time
+
+from src.http_client import default_client
+
+CHECK_INTERVAL = 10  # seconds between health checks of every endpoint
+EWMA_ALPHA = 0.3  # weight of the newest latency sample
+MAX_FAILURES = 3  # consecutive failures before an endpoint leaves rotation
+MAX_LEDGER_LAG = 3  # ledgers an endpoint may trail the newest one and stay healthy
+
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.latency = None  # EWMA of request latency in seconds
+        self.failures = 0
+        self.healthy = True
+        self.latest_ledger = 0
+
+    def record(self, elapsed):
+        self.latency = elapsed if self.latency is None else (
+            EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.latency)
+        self.failures = 0
+
+
+class HorizonPool:
+    """Routes Horizon traffic across several endpoints by measured latency.
+
+    Reads go to the healthy endpoint with the lowest EWMA latency and fail
+    over to the next one on connection errors or 5xx responses.
+    Submissions stay pinned to one endpoint (the first healthy one in
+    configured order) so a transaction and its follow-ups hit the same
+    node; the pin only moves when that endpoint becomes unhealthy. A
+    background check probes every endpoint's root to refresh latency and
+    drops endpoints that are down or trailing the network.
+    """
+
+    def __init__(self, urls, http=default_client, check_interval=CHECK_INTERVAL):
+        self.endpoints = [Endpoint(url.rstrip('/') + '/') for url in urls]
+        self.base_url = self.endpoints[0].url  # URLs are built against this one and rewritten
+        self.http = http
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _read_order(self):
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy]
+            # Unmeasured endpoints sort first so they get a latency sample
+            healthy.sort(key=lambda e: -1 if e.latency is None else e.latency)
+            # If everything is down, still try them all rather than fail outright
+            return healthy or list(self.endpoints)
+
+    def submit_endpoint(self):
+        with self._lock:
+            return next((e for e in self.endpoints if e.healthy), self.endpoints[0])
+
+    def _record_failure(self, endpoint):
+        with self._lock:
+            endpoint.failures += 1
+            if endpoint.failures >= MAX_FAILURES:
+                endpoint.healthy = False
+
+    def _timed(self, endpoint, send, url):
+        started = time.monotonic()
+        response = send(endpoint.url + url[len(self.base_url):])
+        if response.status_code >= 500:
+            self._record_failure(endpoint)
+        else:
+            with self._lock:
+                endpoint.record(time.monotonic() - started)
+        return response
+
+    def read(self, url, send):
+        """Send ``send(routed_url)`` to the fastest healthy endpoint, failing over on errors"""
+        endpoints = self._read_order()
+        for i, endpoint in enumerate(endpoints):
+            last = i == len(endpoints) - 1
+            try:
+                response = self._timed(endpoint, send, url)
+            except Exception:
+                self._record_failure(endpoint)
+                if last:
+                    raise
+                continue
+            if response.status_code < 500 or last:
+                return response
+
+    def submit(self, url, send):
+        """Send a submission to the pinned endpoint; never replayed against another node"""
+        endpoint = self.submit_endpoint()
+        try:
+            return self._timed(endpoint, send, url)
+        except Exception:
+            self._record_failure(endpoint)
+            raise
+
+    def route(self, url):
+        """Rewrite ``url`` onto the fastest healthy endpoint, e.g. for a stream"""
+        return self._read_order()[0].url + url[len(self.base_url):]
+
+    def check(self):
+        """Probe every endpoint's root for latency and its latest ledger"""
+        for endpoint in self.endpoints:
+            started = time.monotonic()
+            try:
+                response = self.http.get(endpoint.url)
+                response.raise_for_status()
+                latest_ledger = response.json().get('history_latest_ledger', 0)
+            except Exception:
+                with self._lock:
+                    endpoint.failures += 1
+                    endpoint.healthy = False
+                continue
+            with self._lock:
+                endpoint.record(time.monotonic() - started)
+                endpoint.latest_ledger = latest_ledger
+        with self._lock:
+            newest = max(e.latest_ledger for e in self.endpoints)
+            for endpoint in self.endpoints:
+                if endpoint.failures == 0:
+                    endpoint.healthy = newest - endpoint.latest_ledger <= MAX_LEDGER_LAG
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        if len(self.endpoints) > 1:
+            threading.Thread(target=self._run, name='horizon-health', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
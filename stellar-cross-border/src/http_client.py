@@ -0,0 +1,101 @@
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Per-host connection pool size, timeout (seconds) and retry budget
+DEFAULT_POLICY = {'pool_size': 10, 'timeout': 10, 'retries': 2}
+HOST_POLICIES = {
+    'horizon-testnet.stellar.org': {'pool_size': 32, 'timeout': 10, 'retries': 2},
+    'friendbot.stellar.org': {'pool_size': 4, 'timeout': 30, 'retries': 1},
+    'api.coingecko.com': {'pool_size': 4, 'timeout': 3, 'retries': 1},
+}
+BACKOFF_FACTOR = 0.2
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class HttpClient:
+    """One keep-alive ``requests.Session`` shared by every outbound call.
+
+    Each known host gets its own mounted adapter, so it has a dedicated
+    connection pool and retry budget, and requests default to that host's
+    timeout. Connections are reused across requests, so the TLS handshake
+    is paid once per pooled connection instead of once per call. Only
+    idempotent methods are retried; transaction submissions are not.
+    """
+
+    def __init__(self, policies=None, default_policy=DEFAULT_POLICY):
+        self.policies = dict(HOST_POLICIES if policies is None else policies)
+        self.default_policy = default_policy
+        self.session = requests.Session()
+        # Hosts without a policy share the default adapter, one pool per host
+        default_adapter = self._adapter(default_policy, hosts=10)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+        for host, policy in self.policies.items():
+            self.session.mount(f'https://{host}', self._adapter(policy))
+
+    @staticmethod
+    def _adapter(policy, hosts=1):
+        retry = Retry(
+            total=policy['retries'],
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        return HTTPAdapter(pool_connections=hosts, pool_maxsize=policy['pool_size'], max_retries=retry)
+
+    def policy_for(self, url):
+        """Return the pool/timeout/retry policy that applies to ``url``"""
+        return self.policies.get(urlsplit(url).hostname, self.default_policy)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.policy_for(url)['timeout'])
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def horizon_client(self, horizon_url, pool=None):
+        """Return a stellar_sdk client that sends Horizon calls through this pool.
+
+        Identical GETs in flight at the same moment (the same account, fee
+        stats, paths...) share one upstream request and its response. With
+        a ``HorizonPool``, requests built against ``horizon_url`` are routed
+        across the pool's endpoints.
+        """
+        from stellar_sdk.client.requests_client import RequestsClient
+        from src.single_flight import SingleFlight
+
+        class CoalescingRequestsClient(RequestsClient):
+            def get(self, url, params=None):
+                key = (url, tuple(sorted((params or {}).items())))
+                if pool is None:
+                    return flight.do(key, RequestsClient.get, self, url, params)
+                return flight.do(key, pool.read, url, lambda routed: RequestsClient.get(self, routed, params))
+
+            def post(self, url, data=None, json_data=None):
+                if pool is None:
+                    return RequestsClient.post(self, url, data, json_data)
+                return pool.submit(url, lambda routed: RequestsClient.post(self, routed, data, json_data))
+
+            def stream(self, url, params=None):
+                return RequestsClient.stream(self, pool.route(url) if pool else url, params)
+
+        flight = SingleFlight()
+        policy = self.policy_for(horizon_url)
+        return CoalescingRequestsClient(
+            pool_size=policy['pool_size'],
+            num_retries=policy['retries'],
+            request_timeout=policy['timeout'],
+            backoff_factor=BACKOFF_FACTOR,
+            session=self.session,
+        )
+
+
+default_client = HttpClient()
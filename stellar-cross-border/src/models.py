@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
+from money import from_stroops
 
 db = SQLAlchemy()
 
@@ -9,7 +10,7 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    stellar_public_key = db.Column(db.String(56), nullable=False)
+    stellar_public_key = db.Column(db.String(56), nullable=False, index=True)
     stellar_secret_key = db.Column(db.String(56), nullable=False)  # Encrypt in production
 
     def set_password(self, password):
@@ -20,14 +21,18 @@ class User(db.Model):
 
 class Escrow(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    receiver_id = db.Column(db.Integer, nullable=False)
-    mediator_id = db.Column(db.Integer, nullable=True)
-    amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, approved, released, locked
+    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    receiver_id = db.Column(db.Integer, nullable=False, index=True)
+    mediator_id = db.Column(db.Integer, nullable=True, index=True)
+    amount_stroops = db.Column(db.BigInteger, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, approved, released, locked
     deadline = db.Column(db.DateTime, nullable=False)
     approvals = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @property
+    def amount(self):
+        return from_stroops(self.amount_stroops)
+
     def is_expired(self):
         return datetime.utcnow() > self.deadline
@@ -0,0 +1,45 @@
+from decimal import Decimal, ROUND_DOWN
+
+# All amounts are integers in units of 1e-7, i.e. stroops for XLM. Fiat
+# amounts and XLM prices use the same fixed point so conversions stay in
+# integer math; Decimal only appears when parsing input or formatting output.
+STROOPS_PER_XLM = 10_000_000
+STROOP = Decimal('0.0000001')
+
+
+def to_stroops(value):
+    """Parse a decimal string or number into integer 1e-7 units, rounding down"""
+    if isinstance(value, int):
+        return value * STROOPS_PER_XLM
+    if isinstance(value, str):
+        # Plain "-123.4567" strings, i.e. nearly every form and CSV amount, skip Decimal
+        whole, _, fraction = value.strip().partition('.')
+        negative = whole[:1] == '-'
+        digits = whole[1:] if negative else whole
+        if digits.isdecimal() and (fraction.isdecimal() or not fraction):
+            units = int(digits) * STROOPS_PER_XLM + int((fraction + '000000')[:7])
+            return -units if negative else units
+    amount = Decimal(str(value)).quantize(STROOP, rounding=ROUND_DOWN)
+    return int(amount.scaleb(7))
+
+
+def from_stroops(units):
+    """Return integer 1e-7 units as a Decimal with seven decimal places"""
+    return Decimal(units).scaleb(-7).quantize(STROOP)
+
+
+def format_stroops(units):
+    """Format integer 1e-7 units as the amount string Horizon expects"""
+    sign = '-' if units < 0 else ''
+    whole, frac = divmod(abs(units), STROOPS_PER_XLM)
+    return f"{sign}{whole}.{frac:07d}"
+
+
+def xlm_to_local(stroops, rate_units):
+    """Convert stroops to local-currency units at ``rate_units`` per XLM"""
+    return stroops * rate_units // STROOPS_PER_XLM
+
+
+def local_to_xlm(local_units, rate_units):
+    """Convert local-currency units to stroops at ``rate_units`` per XLM"""
+    return local_units * STROOPS_PER_XLM // rate_units
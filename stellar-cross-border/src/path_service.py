@@ -0,0 +1,76 @@
+import threading
+
+from stellar_sdk import Asset
+
+from src.money import to_stroops, format_stroops
+
+MAX_PATH_AGE_LEDGERS = 12  # about a minute of ledgers before a cached path is rediscovered
+SLIPPAGE_BPS = 50  # tolerance applied to cached quotes when setting dest_min
+
+
+def _asset_key(asset):
+    return 'native' if asset.is_native() else f"{asset.code}:{asset.issuer}"
+
+
+def _asset_from_record(record):
+    if record['asset_type'] == 'native':
+        return Asset.native()
+    return Asset(record['asset_code'], record['asset_issuer'])
+
+
+def _amount_bucket(stroops):
+    # Amounts within the same power of two share a cached route
+    return stroops.bit_length()
+
+
+class PathFinder:
+    """Finds DEX paths for cross-asset payments and caches them per ledger window.
+
+    Routes are cached per (source asset, destination asset, amount bucket)
+    together with the price they quoted. A cached route is reused until it
+    is ``MAX_PATH_AGE_LEDGERS`` ledgers old, with amounts for other sizes in
+    the same bucket scaled from the cached price.
+    """
+
+    def __init__(self, server, current_ledger):
+        self.server = server
+        self.current_ledger = current_ledger  # callable returning the latest ledger sequence
+        self._routes = {}  # (source, dest, bucket) -> (ledger, path, send_stroops, dest_stroops)
+        self._lock = threading.Lock()
+
+    def _cached(self, key):
+        ledger = self.current_ledger()
+        with self._lock:
+            entry = self._routes.get(key)
+        if entry is not None and ledger - entry[0] < MAX_PATH_AGE_LEDGERS:
+            return entry
+        return None
+
+    def _store(self, key, records):
+        if not records:
+            raise ValueError("No path found between these assets")
+        best = max(records, key=lambda r: to_stroops(r['destination_amount']) * 10**7 // to_stroops(r['source_amount']))
+        entry = (
+            self.current_ledger(),
+            [_asset_from_record(asset) for asset in best['path']],
+            to_stroops(best['source_amount']),
+            to_stroops(best['destination_amount']),
+        )
+        with self._lock:
+            self._routes[key] = entry
+        return entry
+
+    def send_route(self, source_asset, send_stroops, dest_asset):
+        """Return ``{'path', 'send_amount', 'dest_min'}`` for sending exactly ``send_stroops``"""
+        key = (_asset_key(source_asset), _asset_key(dest_asset), _amount_bucket(send_stroops))
+        entry = self._cached(key)
+        if entry is None:
+            page = self.server.strict_send_paths(source_asset, format_stroops(send_stroops), [dest_asset]).call()
+            entry = self._store(key, page['_embedded']['records'])
+        _, path, cached_send, cached_dest = entry
+        dest_estimate = send_stroops * cached_dest // cached_send
+        return {
+            'path': path,
+            'send_amount': send_stroops,
+            'dest_min': dest_estimate * (10000 - SLIPPAGE_BPS) // 10000,
+        }
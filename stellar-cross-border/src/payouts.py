@@ -0,0 +1,96 @@
+import csv
+import io
+
+from stellar_sdk import Keypair
+from stellar_sdk.exceptions import NotFoundError
+
+from src.concurrency import run_concurrently
+from src.money import to_stroops
+
+MAX_OPS_PER_TX = 100  # Stellar protocol limit on operations in one transaction
+MAX_PAYOUT_ROWS = 1000
+CSV_FIELDS = ('destination', 'amount', 'currency')
+MEMO_REQUIRED_KEY = 'config.memo_required'  # SEP-29 account data entry
+MEMO_REQUIRED_VALUE = 'MQ=='  # base64 of "1"
+
+
+def read_csv(text):
+    """Parse ``destination,amount[,currency]`` lines into row dicts; a header line is optional"""
+    rows = []
+    # Excel prefixes UTF-8 exports with a byte order mark, which would hide the header
+    for record in csv.reader(io.StringIO(text.lstrip('\ufeff'))):
+        record = [field.strip() for field in record]
+        if not any(record):
+            continue
+        if not rows and record[0].lower() == 'destination':
+            continue
+        rows.append(dict(zip(CSV_FIELDS, record)))
+    return rows
+
+
+def memo_required(server, destination):
+    """Return True if ``destination`` flags that payments to it need a memo (SEP-29)"""
+    try:
+        account = server.accounts().account_id(destination).call()
+    except NotFoundError:
+        return False
+    return account.get('data', {}).get(MEMO_REQUIRED_KEY) == MEMO_REQUIRED_VALUE
+
+
+def _check_destinations(destinations, requires_memo):
+    """Return ``{destination: error or None}``, looking every destination up concurrently"""
+    def check(destination):
+        try:
+            if requires_memo(destination):
+                return "Destination requires a memo"
+        except Exception as e:
+            return f"Could not check destination: {e}"
+        return None
+
+    destinations = sorted(destinations)
+    return dict(zip(destinations, run_concurrently(*[lambda d=d: check(d) for d in destinations])))
+
+
+def validate_rows(rows, requires_memo=None):
+    """Split payout rows into ``(valid, errors)``.
+
+    Valid rows are ``(index, destination, amount_units, currency)`` with the
+    amount still in the row's currency; errors are per-row result dicts.
+    Payouts carry no memo, so given ``requires_memo`` (destination -> bool)
+    each unique destination is checked once and rows paying one that
+    requires a memo are rejected. The batch can then be submitted without
+    the SDK's own per-operation SEP-29 lookups.
+    """
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            destination = row['destination']
+            Keypair.from_public_key(destination)
+            amount = to_stroops(row['amount'])
+            if amount <= 0:
+                raise ValueError("amount must be positive")
+            currency = (row.get('currency') or 'XLM').upper()
+        except Exception as e:
+            errors.append({'row': index, 'status': 'invalid', 'error': str(e)})
+            continue
+        valid.append((index, destination, amount, currency))
+    if requires_memo is not None:
+        problems = _check_destinations({destination for _, destination, _, _ in valid}, requires_memo)
+        errors.extend({'row': row[0], 'status': 'invalid', 'error': problems[row[1]]}
+                      for row in valid if problems[row[1]])
+        valid = [row for row in valid if not problems[row[1]]]
+    return valid, errors
+
+
+def chunked(items, size=MAX_OPS_PER_TX):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def failed_operations(error):
+    """Return the indexes of ops that failed in a ``tx_failed`` rejection, or None"""
+    extras = getattr(error, 'extras', None) or {}
+    codes = extras.get('result_codes', {})
+    if codes.get('transaction') != 'tx_failed':
+        return None
+    return {i: code for i, code in enumerate(codes.get('operations', [])) if code != 'op_success'}
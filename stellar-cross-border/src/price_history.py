@@ -0,0 +1,135 @@
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from src.money import to_stroops
+
+DEFAULT_CAPACITY = 4096  # samples kept in memory per currency
+
+
+class RingBuffer:
+    """Fixed-size (timestamp, rate) series backed by two int64 arrays"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = array('q', [0]) * capacity
+        self.rates = array('q', [0]) * capacity
+        self.head = 0  # next slot to write
+        self.count = 0
+
+    def append(self, timestamp, rate_units):
+        self.timestamps[self.head] = timestamp
+        self.rates[self.head] = rate_units
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last_timestamp(self):
+        return self.timestamps[self.head - 1] if self.count else None
+
+    def ordered(self):
+        """Return the buffered samples oldest first as ``(timestamps, rates)`` arrays"""
+        if self.count < self.capacity:
+            return self.timestamps[:self.count], self.rates[:self.count]
+        return (self.timestamps[self.head:] + self.timestamps[:self.head],
+                self.rates[self.head:] + self.rates[:self.head])
+
+
+class PriceHistory:
+    """In-memory ring buffers of XLM rates, compacted to on-disk columns.
+
+    Each currency keeps its recent samples in a ``RingBuffer``. ``compact()``
+    appends samples not yet on disk to two column files per currency
+    (``<CUR>.ts`` and ``<CUR>.rate``, raw int64), so range queries older than
+    the ring fall back to a bisect over the on-disk timestamp column.
+    Timestamps are epoch seconds and rates are 1e-7 fixed-point integers.
+    """
+
+    def __init__(self, directory, capacity=DEFAULT_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self._buffers = {}
+        self._flushed_until = {}  # currency -> last timestamp written to disk
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _column_path(self, currency, column):
+        return os.path.join(self.directory, f"{currency}.{column}")
+
+    def record(self, currency, rate, timestamp):
+        """Append one sample, ignoring anything not newer than the last one"""
+        currency, timestamp = currency.upper(), int(timestamp)
+        with self._lock:
+            buffer = self._buffers.get(currency)
+            if buffer is None:
+                buffer = self._buffers[currency] = RingBuffer(self.capacity)
+            last = buffer.last_timestamp()
+            if last is not None and timestamp <= last:
+                return
+            buffer.append(timestamp, to_stroops(rate))
+
+    def _read_disk(self, currency):
+        timestamps, rates = array('q'), array('q')
+        ts_path, rate_path = self._column_path(currency, 'ts'), self._column_path(currency, 'rate')
+        if os.path.exists(ts_path):
+            with open(ts_path, 'rb') as f:
+                timestamps.frombytes(f.read())
+            with open(rate_path, 'rb') as f:
+                rates.frombytes(f.read())
+        # A crash between the two writes can leave one column longer than the other
+        size = min(len(timestamps), len(rates))
+        return timestamps[:size], rates[:size]
+
+    def compact(self):
+        """Append every buffered sample not yet on disk to the column files"""
+        with self._lock:
+            pending = {c: b.ordered() for c, b in self._buffers.items()}
+        for currency, (timestamps, rates) in pending.items():
+            if currency not in self._flushed_until:
+                disk_ts, _ = self._read_disk(currency)
+                self._flushed_until[currency] = disk_ts[-1] if disk_ts else None
+            flushed = self._flushed_until[currency]
+            start = 0 if flushed is None else bisect_right(timestamps, flushed)
+            if start == len(timestamps):
+                continue
+            with open(self._column_path(currency, 'ts'), 'ab') as f:
+                timestamps[start:].tofile(f)
+            with open(self._column_path(currency, 'rate'), 'ab') as f:
+                rates[start:].tofile(f)
+            self._flushed_until[currency] = timestamps[-1]
+
+    def _series(self, currency, start):
+        """Return ordered ``(timestamps, rates)`` covering everything from ``start`` on"""
+        currency = currency.upper()
+        with self._lock:
+            buffer = self._buffers.get(currency)
+            timestamps, rates = buffer.ordered() if buffer else (array('q'), array('q'))
+        if not timestamps or start < timestamps[0]:
+            disk_ts, disk_rates = self._read_disk(currency)
+            # Only take disk samples older than what the ring still holds
+            cutoff = bisect_left(disk_ts, timestamps[0]) if timestamps else len(disk_ts)
+            timestamps, rates = disk_ts[:cutoff] + timestamps, disk_rates[:cutoff] + rates
+        return timestamps, rates
+
+    def range(self, currency, start, end):
+        """Return ``[(timestamp, rate_units), ...]`` with ``start <= timestamp <= end``"""
+        timestamps, rates = self._series(currency, start)
+        lo, hi = bisect_left(timestamps, start), bisect_right(timestamps, end)
+        return list(zip(timestamps[lo:hi], rates[lo:hi]))
+
+    def twap(self, currency, start, end):
+        """Return the time-weighted average rate (1e-7 units) over ``[start, end]``, or None"""
+        timestamps, rates = self._series(currency, start)
+        # Start from the last sample at or before ``start``: it was the live rate then
+        lo, hi = max(bisect_right(timestamps, start) - 1, 0), bisect_right(timestamps, end)
+        timestamps, rates = timestamps[lo:hi], rates[lo:hi]
+        if not timestamps:
+            return None
+        weighted, elapsed = 0, 0
+        for i, rate in enumerate(rates):
+            next_ts = timestamps[i + 1] if i + 1 < len(timestamps) else end
+            span = min(next_ts, end) - max(timestamps[i], start)
+            if span > 0:
+                weighted += rate * span
+                elapsed += span
+        return weighted // elapsed if elapsed else rates[-1]
@@ -0,0 +1,280 @@
+import threading
+import time
+from decimal import Decimal
+
+from src.http_client import default_client
+
+COINGECKO_URL = 'https://api.coingecko.com/api/v3/simple/price'
+DEFAULT_TTL = 300  # seconds a quote is considered fresh
+DEFAULT_REFRESH_INTERVAL = 60  # seconds between background refresh passes
+HOT_WINDOW = 900  # currencies read within this window are kept warm
+FAILURE_THRESHOLD = 3  # consecutive failures before a provider's circuit opens
+RESET_TIMEOUT = 30  # seconds an open circuit waits before a trial call
+
+
+class RateUnavailable(LookupError):
+    """No rate, fresh or last-known-good, exists for some of the requested currencies"""
+
+    def __init__(self, currencies):
+        self.currencies = sorted(currencies)
+        super().__init__(f"No XLM rate available for {', '.join(self.currencies)}")
+
+
+def fetch_xlm_prices(currencies, http=default_client):
+    """Fetch XLM prices for all ``currencies`` from CoinGecko in one request"""
+    vs_currencies = ','.join(sorted(c.lower() for c in currencies))
+    # Timeout and retry budget come from the api.coingecko.com host policy
+    response = http.get(COINGECKO_URL, params={'ids': 'stellar', 'vs_currencies': vs_currencies})
+    response.raise_for_status()
+    quotes = response.json()['stellar']
+    return {c.upper(): Decimal(str(rate)) for c, rate in quotes.items()}
+
+
+class CircuitBreaker:
+    """Stops calling a failing provider until ``reset_timeout`` has passed.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused; once the timeout elapses a single trial call is let
+    through, closing the circuit on success or re-opening it on failure.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self._trial_running = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ProviderChain:
+    """Tries price providers in order, each behind its own circuit breaker.
+
+    Currencies a provider did not return are asked of the next one, so a
+    secondary provider only fills the gaps the primary left.
+    """
+
+    def __init__(self, providers):
+        self.providers = [(name, fetch, CircuitBreaker()) for name, fetch in providers]
+
+    def __call__(self, currencies):
+        remaining, rates = set(currencies), {}
+        for name, fetch, breaker in self.providers:
+            if not remaining:
+                break
+            if not breaker.allow():
+                continue
+            try:
+                fetched = fetch(remaining)
+            except Exception:
+                breaker.record_failure()
+                continue
+            breaker.record_success()
+            rates.update(fetched)
+            remaining -= set(fetched)
+        if not rates:
+            raise RuntimeError(f"No price provider available for {', '.join(sorted(currencies))}")
+        return rates
+
+
+class PriceCache:
+    """Multi-currency XLM price cache with stale-while-revalidate semantics.
+
+    Every upstream call fetches the whole set of hot currencies at once, so
+    a single refresh fills the cache for all of them. Stale entries are
+    still served while a refresh runs in the background; request threads
+    only block on the first read of a currency nobody has asked for yet,
+    and one the provider could not price is not retried on the request path
+    until ``refresh_interval`` has passed. Currencies outside ``supported``
+    are refused without an upstream call. Given a ``RateStore``, all worker
+    processes share one published snapshot.
+    """
+
+    def __init__(self, fetch=fetch_xlm_prices, ttl=DEFAULT_TTL,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL, hot_window=HOT_WINDOW, store=None, history=None,
+                 supported=None):
+        self._fetch = fetch
+        self.supported = {c.upper() for c in supported} if supported is not None else None
+        self._store = store  # optional RateStore shared with other worker processes
+        self._history = history  # optional PriceHistory recording every loaded rate
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.hot_window = hot_window
+        self._entries = {}  # currency -> (rate, fetched_at)
+        self._last_read = {}  # currency -> monotonic time of the last read
+        self._misses = {}  # currency -> monotonic time of the last load that could not price it
+        self._pinned = set()  # currencies refreshed regardless of traffic
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, currency):
+        """Return the cached XLM price for ``currency``; raises ``RateUnavailable`` if there is none"""
+        return self.get_rates([currency])[currency.upper()]
+
+    def stale_currencies(self, currencies):
+        """Return the subset of ``currencies`` served from a last-known-good rate past its TTL"""
+        now = time.monotonic()
+        with self._lock:
+            return {c.upper() for c in currencies
+                    if c.upper() in self._entries and now - self._entries[c.upper()][1] > self.ttl}
+
+    def get_rates(self, currencies, partial=False):
+        """Return a ``{currency: rate}`` snapshot for all ``currencies``.
+
+        A currency that has never been priced raises ``RateUnavailable``;
+        with ``partial`` it is left out of the snapshot instead.
+        """
+        currencies = {c.upper() for c in currencies}
+        now = time.monotonic()
+        rates, missing, stale = {}, set(), False
+        with self._lock:
+            for currency in currencies:
+                if currency == 'XLM':
+                    rates[currency] = Decimal('1')
+                    continue
+                if self.supported is not None and currency not in self.supported:
+                    continue  # never fetched and never made hot
+                self._last_read[currency] = now
+                entry = self._entries.get(currency)
+                if entry is not None:
+                    rates[currency] = entry[0]
+                    stale = stale or now - entry[1] > self.ttl
+                elif currency not in self._misses or now - self._misses[currency] >= self.refresh_interval:
+                    missing.add(currency)
+        if missing:
+            rates.update(self.refresh(missing))
+        elif stale:
+            self._refresh_in_background()
+        unavailable = currencies - set(rates)
+        if unavailable and not partial:
+            raise RateUnavailable(unavailable)
+        return rates
+
+    def refresh(self, currencies=()):
+        """Fetch ``currencies`` plus every hot currency in one upstream call.
+
+        Returns the resulting rates for ``currencies``, keeping the previous
+        rate for any currency the provider did not return and leaving out
+        those that have never been priced.
+        """
+        wanted = {c.upper() for c in currencies} - {'XLM'}
+        batch = wanted | self._hot_currencies()
+        loaded = self._load(batch) if batch else {}
+        if self._history is not None:
+            for currency, (rate, published_at) in loaded.items():
+                self._history.record(currency, rate, published_at)
+        now, wall_now = time.monotonic(), time.time()
+        with self._lock:
+            for currency, (rate, published_at) in loaded.items():
+                # Shared-store timestamps are wall clock; age them onto our monotonic clock
+                self._entries[currency] = (rate, now - max(0, wall_now - published_at))
+                self._misses.pop(currency, None)
+            for currency in batch - set(self._entries):
+                self._misses[currency] = now
+            return {c: self._entries[c][0] for c in wanted if c in self._entries}
+
+    def _load(self, batch):
+        """Return ``{currency: (rate, published_at)}`` for ``batch``.
+
+        With a shared store, only the writer process calls the provider and
+        publishes the result; every other worker reads the published
+        snapshot and only goes upstream for currencies nobody has published.
+        """
+        loaded = {}
+        is_writer = self._store is None or self._store.try_become_writer()
+        if not is_writer:
+            try:
+                loaded = self._store.read(batch)
+            except Exception:
+                loaded = {}
+            batch = batch - set(loaded)
+            if not batch:
+                return loaded
+        try:
+            fetched = self._fetch(batch)
+        except Exception:
+            return loaded
+        if is_writer and self._store is not None:
+            try:
+                self._store.publish(fetched)
+            except Exception:
+                pass
+        published_at = time.time()
+        loaded.update((c, (rate, published_at)) for c, rate in fetched.items())
+        return loaded
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='price-refresh', daemon=True).start()
+
+    def _hot_currencies(self):
+        now = time.monotonic()
+        with self._lock:
+            # Forget currencies nobody reads any more so the map stays bounded
+            for currency in [c for c, t in self._last_read.items() if now - t > self.hot_window]:
+                del self._last_read[currency]
+                self._misses.pop(currency, None)
+            return set(self._last_read) | self._pinned
+
+    def _run(self):
+        while not self._stop.is_set():
+            hot = self._hot_currencies()
+            with self._lock:
+                oldest = min((self._entries[c][1] for c in hot if c in self._entries), default=None)
+                missing = hot - set(self._entries)
+            # Refresh a little ahead of expiry so readers rarely see stale data
+            if missing or oldest is None or time.monotonic() - oldest > self.ttl - self.refresh_interval:
+                self.refresh()
+            # Only the process publishing rates writes history to disk
+            if self._history is not None and (self._store is None or self._store.try_become_writer()):
+                try:
+                    self._history.compact()
+                except OSError:
+                    pass
+            self._stop.wait(self.refresh_interval)
+
+    def start(self, currencies=()):
+        """Start the background refresher, keeping ``currencies`` warm at all times"""
+        with self._lock:
+            self._pinned.update(c.upper() for c in currencies)
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='price-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,74 @@
+import time
+from decimal import Decimal
+
+from src.sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_snapshot (
+    currency TEXT PRIMARY KEY,
+    rate TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_store_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO rate_store_meta (id, version) VALUES (1, 0);
+"""
+
+
+class RateStore:
+    """XLM rate snapshot shared by every worker process on a host.
+
+    Rates live in a small SQLite file in WAL mode, so readers never block on
+    the writer. Exactly one process holds the store's owner lock and
+    publishes new snapshots; if that process dies another worker takes over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = SQLiteStore(path, SCHEMA)
+
+    def _connection(self):
+        return self._db.connection()
+
+    def try_become_writer(self):
+        """Return True if this process holds (or just acquired) the writer lock"""
+        return self._db.try_lock()
+
+    def publish(self, rates):
+        """Publish ``{currency: rate}`` as a new snapshot version; writer only"""
+        if not self.try_become_writer():
+            raise RuntimeError("Another process owns the rate store")
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('UPDATE rate_store_meta SET version = version + 1 WHERE id = 1')
+            version = conn.execute('SELECT version FROM rate_store_meta WHERE id = 1').fetchone()[0]
+            conn.executemany(
+                'INSERT OR REPLACE INTO rate_snapshot (currency, rate, published_at, version) VALUES (?, ?, ?, ?)',
+                [(currency, str(rate), now, version) for currency, rate in rates.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return version
+
+    def read(self, currencies):
+        """Return ``{currency: (rate, published_at)}`` for the published ``currencies``"""
+        currencies = list(currencies)
+        if not currencies:
+            return {}
+        placeholders = ','.join('?' * len(currencies))
+        rows = self._connection().execute(
+            f'SELECT currency, rate, published_at FROM rate_snapshot WHERE currency IN ({placeholders})',
+            currencies
+        ).fetchall()
+        return {currency: (Decimal(rate), published_at) for currency, rate, published_at in rows}
+
+    def version(self):
+        """Return the version number of the latest published snapshot"""
+        return self._connection().execute('SELECT version FROM rate_store_meta WHERE id = 1').fetchone()[0]
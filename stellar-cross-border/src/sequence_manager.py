@@ -0,0 +1,100 @@
+import threading
+
+from stellar_sdk import Account
+from stellar_sdk.exceptions import BadRequestError
+
+
+def _transaction_code(error):
+    extras = getattr(error, 'extras', None) or {}
+    return extras.get('result_codes', {}).get('transaction')
+
+
+def is_bad_seq(error):
+    """Return True if a Horizon submission error is ``tx_bad_seq``"""
+    return _transaction_code(error) == 'tx_bad_seq'
+
+
+class SequenceManager:
+    """Caches and atomically hands out sequence numbers per source account.
+
+    The first transaction from an account loads it from Horizon; after that
+    each caller gets an ``Account`` whose next sequence number is reserved
+    for it alone, so no ``load_account`` round trip is needed and parallel
+    builds from one account never reuse a number. A transaction rejected
+    before reaching a ledger gives its number back (see ``release``); only
+    ``tx_failed`` means the ledger consumed it.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self._sequences = {}  # public_key -> last sequence number handed out
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, public_key):
+        with self._guard:
+            return self._locks.setdefault(public_key, threading.Lock())
+
+    def next_account(self, public_key):
+        """Return an ``Account`` whose next transaction uses a freshly reserved sequence number"""
+        with self._lock_for(public_key):
+            sequence = self._sequences.get(public_key)
+            if sequence is None:
+                sequence = self.server.load_account(public_key).sequence
+            # TransactionBuilder uses ``account.sequence + 1`` for the transaction it builds
+            self._sequences[public_key] = sequence + 1
+            return Account(public_key, sequence)
+
+    def release(self, public_key, sequence):
+        """Give back ``sequence``, reserved for a transaction that was never sent.
+
+        If no later number has been handed out it is reused; otherwise the
+        later transactions already skip over it and would be rejected, so
+        the cache is resynced from Horizon instead.
+        """
+        with self._lock_for(public_key):
+            if self._sequences.get(public_key) == sequence:
+                self._sequences[public_key] = sequence - 1
+            else:
+                self._sequences.pop(public_key, None)
+
+    def build(self, public_key, build):
+        """Return ``build(account)`` with a reserved sequence number, released again if ``build`` raises"""
+        account = self.next_account(public_key)
+        sequence = account.sequence + 1
+        try:
+            return build(account)
+        except Exception:
+            self.release(public_key, sequence)
+            raise
+
+    def current(self, public_key):
+        """Return the last sequence number handed out for ``public_key``, or None if not cached"""
+        with self._lock_for(public_key):
+            return self._sequences.get(public_key)
+
+    def adopt(self, public_key, sequence):
+        """Continue from ``sequence``, the last number another process used for ``public_key``"""
+        with self._lock_for(public_key):
+            self._sequences[public_key] = sequence
+
+    def resync(self, public_key):
+        """Forget the cached sequence so the next transaction reloads it from Horizon"""
+        with self._lock_for(public_key):
+            self._sequences.pop(public_key, None)
+
+    def submit(self, public_key, build, skip_memo_required_check=False):
+        """Submit ``build(account)`` with a managed sequence number, resyncing once on ``tx_bad_seq``"""
+        for attempt in range(2):
+            tx = self.build(public_key, build)
+            try:
+                return self.server.submit_transaction(tx, skip_memo_required_check=skip_memo_required_check)
+            except BadRequestError as e:
+                if is_bad_seq(e):
+                    self.resync(public_key)
+                    if attempt == 0:
+                        continue
+                elif _transaction_code(e) != 'tx_failed':
+                    # Rejected before reaching a ledger, so the number was never consumed
+                    self.release(public_key, tx.transaction.sequence)
+                raise
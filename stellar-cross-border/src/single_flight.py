@@ -0,0 +1,43 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one in-flight call.
+
+    The first caller for a key runs the call; callers that arrive with the
+    same key while it is running wait for it and get the same result or
+    exception instead of going upstream themselves. Nothing is cached once
+    the call finishes, so the next caller starts a fresh one.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+
+    def do(self, key, call, *args, **kwargs):
+        """Return ``call(*args, **kwargs)``, sharing one execution per ``key`` among concurrent callers"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = call(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def wrap(self, call, key=lambda *args: args):
+        """Return ``call`` coalesced on ``key(*args)``"""
+        def coalesced(*args):
+            return self.do(key(*args), call, *args)
+        return coalesced
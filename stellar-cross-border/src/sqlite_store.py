@@ -0,0 +1,50 @@
+import fcntl
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """A SQLite file shared by every worker process on a host.
+
+    The file is opened in WAL mode, so readers never block on the writer,
+    and each thread gets its own autocommit connection. ``try_lock`` elects
+    one owner process among those sharing the file with an exclusive
+    ``flock`` on a sibling lock file; if the owner dies the OS drops the
+    lock and another process can take over.
+    """
+
+    def __init__(self, path, schema, row_factory=None):
+        self.path = path
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._lock_fd = None
+        self._owner_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self.connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(schema)
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            self._local.conn = conn
+        return conn
+
+    def try_lock(self):
+        """Return True if this process holds (or just acquired) the owner lock"""
+        with self._owner_lock:
+            if self._lock_fd is not None:
+                return True
+            fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+            return True
@@ -0,0 +1,205 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from stellar_sdk import TransactionEnvelope
+from stellar_sdk.exceptions import BadRequestError, BadResponseError, NotFoundError
+from stellar_sdk.xdr import TransactionResult
+
+from src.sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission_job (
+    id TEXT PRIMARY KEY,
+    owner TEXT,
+    source TEXT NOT NULL,
+    envelope_xdr TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tx_hash TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    submitted_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_submission_job_due ON submission_job (status, next_attempt_at);
+"""
+
+WORKERS = 4
+POLL_INITIAL = 1  # seconds before the first result poll
+POLL_MAX = 8  # cap on the poll backoff
+POLL_TIMEOUT = 90  # give up on a pending transaction after this long (tx timebounds are 30s)
+CLAIM_LEASE = 30  # seconds a claimed job is hidden from other workers
+IDLE_WAIT = 0.5
+
+# queued -> submitting -> pending -> success | failed
+QUEUED, SUBMITTING, PENDING, SUCCESS, FAILED = 'queued', 'submitting', 'pending', 'success', 'failed'
+
+
+def _result_code(error):
+    """Return the transaction result code from an async submission error, if Horizon sent one"""
+    try:
+        result_xdr = json.loads(error.message).get('errorResultXdr')
+        return TransactionResult.from_xdr(result_xdr).result.code if result_xdr else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class SubmissionQueue:
+    """Persistent queue that submits signed transactions off the request path.
+
+    Routes ``enqueue`` a signed envelope and return the job ID at once. A
+    pool of worker threads submits jobs through Horizon's async endpoint,
+    which only waits for Stellar Core to accept the transaction, then polls
+    ``/transactions/<hash>`` with backoff until it lands in a ledger. Jobs
+    live in a SQLite table, so a restart resumes where it stopped and
+    several processes can share one queue. Jobs from the same source
+    account are submitted one at a time in enqueue order so their sequence
+    numbers reach Core in order.
+    """
+
+    def __init__(self, server, path, network_passphrase, workers=WORKERS, on_bad_seq=None,
+                 poll_initial=POLL_INITIAL, poll_max=POLL_MAX, poll_timeout=POLL_TIMEOUT):
+        self.server = server
+        self.path = path
+        self.network_passphrase = network_passphrase
+        self.workers = workers
+        self._on_bad_seq = on_bad_seq  # source public key -> None, called when a sequence number went unused
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_timeout = poll_timeout
+        self._db = SQLiteStore(path, SCHEMA, row_factory=sqlite3.Row)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def _connection(self):
+        return self._db.connection()
+
+    def enqueue(self, tx, owner=None):
+        """Queue a signed transaction envelope and return its job ID"""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            'INSERT INTO submission_job (id, owner, source, envelope_xdr, status, next_attempt_at, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, owner, tx.transaction.source.account_id, tx.to_xdr(), QUEUED, now, now, now)
+        )
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id):
+        """Return the job as a dict, or None if it does not exist"""
+        row = self._connection().execute(
+            'SELECT id, owner, status, tx_hash, error, attempts, created_at, updated_at FROM submission_job WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def _claim(self):
+        """Atomically take the next due job; queued jobs wait while their source has one submitting"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT * FROM submission_job WHERE next_attempt_at <= ? AND ('
+                '  status = ? OR (status = ? AND source NOT IN '
+                '    (SELECT source FROM submission_job WHERE status = ?)'
+                '  AND NOT EXISTS (SELECT 1 FROM submission_job AS earlier WHERE earlier.source = submission_job.source'
+                '    AND earlier.status = ? AND earlier.rowid < submission_job.rowid))'
+                ') ORDER BY next_attempt_at LIMIT 1',
+                (now, PENDING, QUEUED, SUBMITTING, QUEUED)
+            ).fetchone()
+            if row is not None:
+                status = SUBMITTING if row['status'] == QUEUED else PENDING
+                conn.execute(
+                    'UPDATE submission_job SET status = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?',
+                    (status, now + CLAIM_LEASE, now, row['id'])
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _update(self, job_id, status, delay=0, **fields):
+        now = time.time()
+        columns = ''.join(f', {name} = ?' for name in fields)
+        self._connection().execute(
+            f'UPDATE submission_job SET status = ?, next_attempt_at = ?, updated_at = ?{columns} WHERE id = ?',
+            (status, now + delay, now, *fields.values(), job_id)
+        )
+
+    def _backoff(self, attempts):
+        return min(self.poll_initial * 2 ** attempts, self.poll_max)
+
+    def _submit(self, job):
+        envelope = TransactionEnvelope.from_xdr(job['envelope_xdr'], self.network_passphrase)
+        tx_hash = envelope.hash_hex()
+        try:
+            self.server.submit_transaction_async(envelope, skip_memo_required_check=True)
+        except BadRequestError as e:
+            if e.status != 409:  # 409 means Core already has this transaction
+                code = _result_code(e)
+                # Rejected before reaching a ledger, so its sequence number was never consumed
+                if self._on_bad_seq:
+                    self._on_bad_seq(job['source'])
+                self._update(job['id'], FAILED, tx_hash=tx_hash, error=code.name if code else e.message)
+                return
+        except BadResponseError:
+            # TRY_AGAIN_LATER: Core is congested, resubmit the same envelope after a pause
+            self._update(job['id'], QUEUED, self._backoff(job['attempts']), attempts=job['attempts'] + 1)
+            return
+        self._update(job['id'], PENDING, self.poll_initial, tx_hash=tx_hash, attempts=0, submitted_at=time.time())
+
+    def _poll(self, job):
+        try:
+            result = self.server.transactions().transaction(job['tx_hash']).call()
+        except NotFoundError:
+            if time.time() - job['submitted_at'] > self.poll_timeout:
+                if self._on_bad_seq:
+                    self._on_bad_seq(job['source'])
+                self._update(job['id'], FAILED, error='Transaction was not included before it expired')
+            else:
+                self._update(job['id'], PENDING, self._backoff(job['attempts']), attempts=job['attempts'] + 1)
+            return
+        if result.get('successful'):
+            self._update(job['id'], SUCCESS)
+        else:
+            self._update(job['id'], FAILED, error=result.get('result_xdr'))
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.OperationalError:
+                job = None  # another process holds the write lock; try again shortly
+            if job is None:
+                self._wake.wait(IDLE_WAIT)
+                self._wake.clear()
+                continue
+            try:
+                if job['status'] == QUEUED:
+                    self._submit(job)
+                else:
+                    self._poll(job)
+            except Exception as e:
+                # Network trouble: leave the job where it was and retry after a backoff
+                self._update(job['id'], job['status'], self._backoff(job['attempts']),
+                             attempts=job['attempts'] + 1, error=str(e))
+
+    def start(self):
+        """Requeue jobs whose submitter died mid-submit, then start the worker threads"""
+        self._connection().execute(
+            'UPDATE submission_job SET status = ? WHERE status = ? AND next_attempt_at <= ?',
+            (QUEUED, SUBMITTING, time.time())
+        )
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'tx-submit-{i}', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
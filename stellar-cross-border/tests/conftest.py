@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the Flask app and src package the way app.py is run: from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
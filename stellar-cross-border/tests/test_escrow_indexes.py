@@ -0,0 +1,33 @@
+from sqlalchemy import create_engine
+
+import app as stellar_app
+
+
+def explain(engine, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for ``statement`` with its bound parameters"""
+    compiled = statement.compile(engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+def test_escrow_approvals_uses_partial_indexes():
+    engine = create_engine('sqlite://')
+    stellar_app.db.metadata.create_all(engine)
+    user = stellar_app.User(id=1, stellar_public_key='G' * 56)
+    with stellar_app.app.app_context():
+        plan = explain(engine, stellar_app.pending_escrows_for(user).statement)
+
+    # SEARCH, not SCAN: a full pass over a partial index would also name it
+    for index in ('ix_escrow_pending_sender', 'ix_escrow_pending_receiver', 'ix_escrow_pending_mediator'):
+        assert f'SEARCH escrow USING INDEX {index} (' in plan
+
+
+def test_user_lookup_by_public_key_uses_index():
+    engine = create_engine('sqlite://')
+    stellar_app.db.metadata.create_all(engine)
+    with stellar_app.app.app_context():
+        plan = explain(engine, stellar_app.User.query.filter_by(stellar_public_key='G' * 56).statement)
+
+    assert 'SEARCH user USING INDEX ix_user_stellar_public_key (' in plan